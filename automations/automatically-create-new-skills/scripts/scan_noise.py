@@ -17,6 +17,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Set
 
+REVIEW_HISTORY_DIR = Path(__file__).resolve().parents[2] / "daily-automation-review" / "scripts"
+if str(REVIEW_HISTORY_DIR) not in sys.path:
+    sys.path.insert(0, str(REVIEW_HISTORY_DIR))
+
 
 SIGNALS: List[str] = [
     "quick_validate failure",
@@ -49,8 +53,9 @@ SIGNALS: List[str] = [
     "write_stdin failed: stdin is closed",
 ]
 
-BACKTICK_SKILL_PATTERN = re.compile(r"`([a-z0-9-]+)`")
-DOLLAR_SKILL_PATTERN = re.compile(r"\$([a-z0-9-]+)")
+# Backtick (`name`) and dollar ($name) mentions share one alternation so each
+# message is scanned once; tokens are then resolved against the skill set.
+SKILL_MENTION_PATTERN = re.compile(r"`([a-z0-9-]+)`|\$([a-z0-9-]+)")
 SKILL_PATH_PATTERN = re.compile(r"(/[^\s\"']*SKILL\.md)")
 SHELL_FAILURE_LINE_PATTERN = re.compile(
     r"(?m)^(?:ls|sed|cat|rg|git|find|python|python3|bash|zsh|jq|gh|timeout|pdfinfo|grepai): .+$"
@@ -126,6 +131,18 @@ def parse_args() -> argparse.Namespace:
         default=[],
         help="Optional JSONL file to scan. Repeatable; overrides time window.",
     )
+    parser.add_argument(
+        "--history-db",
+        type=str,
+        default=None,
+        help="Also append signal/skill aggregates to this SQLite review-history store.",
+    )
+    parser.add_argument(
+        "--history-date",
+        type=str,
+        default=None,
+        help="Date key for --history-db (default: the sessions/YYYY/MM/DD partition, else today).",
+    )
     return parser.parse_args()
 
 
@@ -133,29 +150,24 @@ def get_codex_home() -> Path:
     return Path(os.environ.get("CODEX_HOME", str(Path.home() / ".codex"))).expanduser()
 
 
-def discover_skill_names(codex_home: Path) -> Set[str]:
-    skills_root = codex_home / "skills"
-    names: Set[str] = set()
-    if not skills_root.is_dir():
-        return names
-    for skill_md in skills_root.rglob("SKILL.md"):
-        names.add(skill_md.parent.name)
-    return names
-
-
-def modified_skills_7d(codex_home: Path, now_ts: float) -> Set[str]:
+def discover_skills(codex_home: Path) -> Dict[str, float]:
     skills_root = codex_home / "skills"
-    modified: Set[str] = set()
+    skills: Dict[str, float] = {}
     if not skills_root.is_dir():
-        return modified
-    cutoff = now_ts - 7 * 24 * 60 * 60
+        return skills
     for skill_md in skills_root.rglob("SKILL.md"):
         try:
-            if skill_md.stat().st_mtime >= cutoff:
-                modified.add(skill_md.parent.name)
+            mtime = skill_md.stat().st_mtime
         except FileNotFoundError:
             continue
-    return modified
+        name = skill_md.parent.name
+        skills[name] = max(mtime, skills.get(name, mtime))
+    return skills
+
+
+def modified_skills_7d(skill_mtimes: Dict[str, float], now_ts: float) -> Set[str]:
+    cutoff = now_ts - 7 * 24 * 60 * 60
+    return {name for name, mtime in skill_mtimes.items() if mtime >= cutoff}
 
 
 def list_session_files(codex_home: Path, since_seconds: int, explicit_files: List[str]) -> List[Path]:
@@ -250,10 +262,8 @@ def extract_skills_from_text(text: str, known_skills: Set[str]) -> Set[str]:
     if is_instruction_boilerplate(text):
         return set()
     found: Set[str] = set()
-    for token in BACKTICK_SKILL_PATTERN.findall(text):
-        if token in known_skills:
-            found.add(token)
-    for token in DOLLAR_SKILL_PATTERN.findall(text):
+    for backtick_token, dollar_token in SKILL_MENTION_PATTERN.findall(text):
+        token = backtick_token or dollar_token
         if token in known_skills:
             found.add(token)
     return found
@@ -334,7 +344,8 @@ def main() -> int:
     args = parse_args()
     codex_home = get_codex_home()
     now_ts = time.time()
-    known_skills = discover_skill_names(codex_home)
+    skill_mtimes = discover_skills(codex_home)
+    known_skills = set(skill_mtimes)
     session_files = list_session_files(codex_home, args.since_seconds, args.file)
 
     signal_stats: Dict[str, SignalStats] = {}
@@ -469,7 +480,7 @@ def main() -> int:
                 break
     high_noise_skills_before = sorted(set(high_noise_skills_before))
 
-    modified_7d = modified_skills_7d(codex_home, now_ts)
+    modified_7d = modified_skills_7d(skill_mtimes, now_ts)
     recently_touched_union = sorted(used_skills_24h | modified_7d)
     high_noise_skills_after = [
         skill for skill in high_noise_skills_before if skill in set(recently_touched_union)
@@ -516,6 +527,15 @@ def main() -> int:
             "union": recently_touched_union,
         },
     }
+    if args.history_db:
+        from review_history import infer_run_date, record_run
+
+        record_run(
+            Path(args.history_db).expanduser(),
+            source="scan_noise",
+            run_date=args.history_date or infer_run_date(session_files),
+            result=result,
+        )
     json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
     sys.stdout.write("\n")
     return 0
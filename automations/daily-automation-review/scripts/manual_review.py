@@ -10,6 +10,8 @@ from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Any
 
+from review_history import infer_run_date, record_run
+
 READ_ONLY_PREFIXES = (
     "cat ",
     "sed ",
@@ -83,6 +85,17 @@ def parse_args() -> argparse.Namespace:
         default=[],
         help="Session JSONL file to review. Repeatable.",
     )
+    parser.add_argument(
+        "--history-db",
+        type=Path,
+        default=None,
+        help="Also append the summary aggregates to this SQLite review-history store.",
+    )
+    parser.add_argument(
+        "--history-date",
+        default=None,
+        help="Date key for --history-db (default: the sessions/YYYY/MM/DD partition, else today).",
+    )
     return parser.parse_args()
 
 
@@ -431,7 +444,15 @@ def main() -> int:
     if missing:
         raise SystemExit(f"Missing session files: {', '.join(missing)}")
     codex_home = Path(os.environ.get("CODEX_HOME", str(Path.home() / ".codex"))).expanduser()
-    print(json.dumps(summarize(files, codex_home), ensure_ascii=False, indent=2))
+    summary = summarize(files, codex_home)
+    if args.history_db is not None:
+        record_run(
+            args.history_db.expanduser(),
+            source="manual_review",
+            run_date=args.history_date or infer_run_date(files),
+            result=summary,
+        )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
     return 0
 
 
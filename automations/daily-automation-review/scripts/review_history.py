@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Iterable
+
+SESSION_DATE_PATTERN = re.compile(r"/sessions/(\d{4})/(\d{2})/(\d{2})/")
+SNAPSHOT_DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})")
+# scan-noise-2026-03-31.postfix.json: a re-run kept next to the canonical snapshot of that day.
+SNAPSHOT_VARIANT_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}\.(?!json$)")
+MANUAL_REVIEW_SECTIONS = (
+    ("top_operational", "operational", "label"),
+    ("top_repo_specific", "repo_specific", "label"),
+    ("top_missing_paths", "missing_path", "path"),
+    ("top_missing_modules", "missing_module", "module"),
+    ("skill_path_drift", "skill_path_drift", "mapping"),
+)
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS review_runs (
+        source TEXT NOT NULL,
+        run_date TEXT NOT NULL,
+        origin TEXT NOT NULL DEFAULT '',
+        files_scanned INTEGER NOT NULL,
+        recorded_from TEXT,
+        PRIMARY KEY (source, run_date, origin)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS review_labels (
+        source TEXT NOT NULL,
+        run_date TEXT NOT NULL,
+        origin TEXT NOT NULL DEFAULT '',
+        category TEXT NOT NULL,
+        label TEXT NOT NULL,
+        skill TEXT NOT NULL DEFAULT '',
+        count INTEGER NOT NULL,
+        sessions INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS review_labels_by_date ON review_labels (run_date, category, label)",
+    "CREATE INDEX IF NOT EXISTS review_labels_by_skill ON review_labels (skill, run_date)",
+    "CREATE INDEX IF NOT EXISTS review_labels_by_run ON review_labels (source, run_date, origin)",
+)
+INDEXES = ("review_labels_by_date", "review_labels_by_skill", "review_labels_by_run")
+# Version 2 keys runs on their origin (the automation that recorded them) as well as source and date.
+SCHEMA_VERSION = 2
+
+LabelRow = tuple[str, str, str, int, int]
+
+
+def default_history_db() -> Path:
+    codex_home = Path(os.environ.get("CODEX_HOME", str(Path.home() / ".codex"))).expanduser()
+    return codex_home / "automations" / "review-history.sqlite3"
+
+
+def infer_run_date(files: Iterable[Path]) -> str:
+    dates = set()
+    for path in files:
+        match = SESSION_DATE_PATTERN.search(str(path))
+        if match is None:
+            return date.today().isoformat()
+        dates.add("-".join(match.groups()))
+    if len(dates) == 1:
+        return dates.pop()
+    return date.today().isoformat()
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    with connection:
+        if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            migrate_v1(connection)
+        for statement in SCHEMA:
+            connection.execute(statement)
+    return connection
+
+
+def snapshot_origin(recorded_from: str | None) -> str:
+    """Automation folder a snapshot was saved in; '' for runs recorded live."""
+    return Path(recorded_from).parent.name if recorded_from else ""
+
+
+def migrate_v1(connection: sqlite3.Connection) -> None:
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "review_runs" in tables:
+        connection.create_function("snapshot_origin", 1, snapshot_origin)
+        for index in INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {index}")
+        for table in ("review_runs", "review_labels"):
+            connection.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute(
+            "INSERT INTO review_runs (source, run_date, origin, files_scanned, recorded_from) "
+            "SELECT source, run_date, snapshot_origin(recorded_from), files_scanned, recorded_from FROM review_runs_v1"
+        )
+        connection.execute(
+            "INSERT INTO review_labels (source, run_date, origin, category, label, skill, count, sessions) "
+            "SELECT l.source, l.run_date, snapshot_origin(r.recorded_from), l.category, l.label, l.skill, l.count, "
+            "l.sessions FROM review_labels_v1 l LEFT JOIN review_runs_v1 r USING (source, run_date)"
+        )
+        for table in ("review_runs", "review_labels"):
+            connection.execute(f"DROP TABLE {table}_v1")
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _count_entry(entry: Any) -> tuple[int, int]:
+    if not isinstance(entry, dict):
+        return 0, 0
+    return int(entry.get("count") or 0), int(entry.get("sessions") or 0)
+
+
+def scan_noise_rows(result: dict[str, Any]) -> list[LabelRow]:
+    rows: list[LabelRow] = []
+    signals = result.get("signals")
+    if isinstance(signals, dict):
+        for signal, entry in signals.items():
+            rows.append(("signal", signal, "", *_count_entry(entry)))
+    skills = result.get("skills")
+    if isinstance(skills, dict):
+        for skill, skill_entry in skills.items():
+            per_signal = skill_entry.get("signals") if isinstance(skill_entry, dict) else None
+            if not isinstance(per_signal, dict):
+                continue
+            for signal, entry in per_signal.items():
+                rows.append(("skill_signal", signal, skill, *_count_entry(entry)))
+    return rows
+
+
+def manual_review_rows(result: dict[str, Any]) -> list[LabelRow]:
+    rows: list[LabelRow] = []
+    for section, category, key in MANUAL_REVIEW_SECTIONS:
+        entries = result.get(section)
+        if not isinstance(entries, list):
+            continue
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get(key), str):
+                continue
+            rows.append((category, entry[key], "", *_count_entry(entry)))
+    return rows
+
+
+def record_run(
+    db_path: Path,
+    *,
+    source: str,
+    run_date: str,
+    result: dict[str, Any],
+    recorded_from: str | None = None,
+    origin: str | None = None,
+) -> int:
+    if source == "scan_noise":
+        rows = scan_noise_rows(result)
+    elif source == "manual_review":
+        rows = manual_review_rows(result)
+    else:
+        raise ValueError(f"unknown review source: {source}")
+    key = (source, run_date, snapshot_origin(recorded_from) if origin is None else origin)
+    connection = connect(db_path)
+    try:
+        with connection:
+            # Re-running a review for the same day and origin replaces that day's aggregates.
+            connection.execute(
+                "DELETE FROM review_labels WHERE source = ? AND run_date = ? AND origin = ?",
+                key,
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO review_runs (source, run_date, origin, files_scanned, recorded_from) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, int(result.get("files_scanned") or 0), recorded_from),
+            )
+            connection.executemany(
+                "INSERT INTO review_labels (source, run_date, origin, category, label, skill, count, sessions) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, *row) for row in rows],
+            )
+    finally:
+        connection.close()
+    return len(rows)
+
+
+def detect_snapshot_source(result: dict[str, Any]) -> str | None:
+    if "top_operational" in result or "top_repo_specific" in result:
+        return "manual_review"
+    if "signals" in result and "high_signals" in result:
+        return "scan_noise"
+    return None
+
+
+def backfill(db_path: Path, snapshots: list[Path]) -> list[dict[str, Any]]:
+    imported: list[dict[str, Any]] = []
+    for snapshot in sorted(snapshots):
+        match = SNAPSHOT_DATE_PATTERN.search(snapshot.name)
+        if match is None:
+            continue
+        if SNAPSHOT_VARIANT_PATTERN.search(snapshot.name):
+            imported.append({"snapshot": str(snapshot), "skipped": "re-run variant of a dated snapshot"})
+            continue
+        try:
+            result = json.loads(snapshot.read_text())
+        except (OSError, json.JSONDecodeError):
+            continue
+        if not isinstance(result, dict):
+            continue
+        source = detect_snapshot_source(result)
+        if source is None:
+            continue
+        rows = record_run(
+            db_path,
+            source=source,
+            run_date=match.group(1),
+            result=result,
+            recorded_from=str(snapshot),
+        )
+        imported.append({"snapshot": str(snapshot), "source": source, "run_date": match.group(1), "rows": rows})
+    return imported
+
+
+def top_labels(
+    db_path: Path,
+    *,
+    days: int,
+    category: str | None,
+    skill: str | None,
+    limit: int,
+    today: date | None = None,
+) -> list[dict[str, Any]]:
+    since = ((today or date.today()) - timedelta(days=days)).isoformat()
+    clauses = ["run_date >= ?"]
+    params: list[Any] = [since]
+    if category:
+        clauses.append("category = ?")
+        params.append(category)
+    if skill:
+        clauses.append("skill = ?")
+        params.append(skill)
+    # Several automations review the same day's sessions; count each day once, by its largest review.
+    query = (
+        "SELECT category, label, skill, COUNT(*) AS days_seen, SUM(count) AS total_count, "
+        "SUM(sessions) AS total_sessions, MIN(run_date) AS first_seen, MAX(run_date) AS last_seen "
+        "FROM (SELECT run_date, category, label, skill, MAX(count) AS count, MAX(sessions) AS sessions "
+        f"FROM review_labels WHERE {' AND '.join(clauses)} GROUP BY run_date, category, label, skill) "
+        "GROUP BY category, label, skill "
+        "ORDER BY days_seen DESC, total_count DESC, label ASC LIMIT ?"
+    )
+    params.append(limit)
+    connection = connect(db_path)
+    try:
+        cursor = connection.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query and backfill the automation review history store.")
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="SQLite history store (default: $CODEX_HOME/automations/review-history.sqlite3).",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query = subparsers.add_parser("top-labels", help="Top recurring labels over a lookback window.")
+    query.add_argument("--days", type=int, default=30)
+    query.add_argument(
+        "--category",
+        default=None,
+        help="Restrict to one category (signal, skill_signal, operational, repo_specific, "
+        "missing_path, missing_module, skill_path_drift).",
+    )
+    query.add_argument("--skill", default=None, help="Restrict scanner skill attribution rows to one skill.")
+    query.add_argument("--limit", type=int, default=20)
+
+    backfill_parser = subparsers.add_parser(
+        "backfill",
+        help="Import dated scan-noise-*.json / manual-review-*.json snapshots, keyed by their automation folder.",
+    )
+    backfill_parser.add_argument("snapshots", nargs="+", type=Path)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    db_path = (args.db or default_history_db()).expanduser()
+    if args.command == "backfill":
+        output: Any = backfill(db_path, [path.expanduser() for path in args.snapshots])
+    else:
+        output = top_labels(
+            db_path,
+            days=args.days,
+            category=args.category,
+            skill=args.skill,
+            limit=args.limit,
+        )
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
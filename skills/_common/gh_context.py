@@ -0,0 +1,275 @@
+"""Process-wide memo of git and GitHub repository identity.
+
+The gh-based skills ask for the same facts (repo root, branch, repo slug, fork
+parent) several times per run; each is resolved once per repo root here and
+shared by every caller in the process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from gh_http_cache import gh_host
+
+REPO_VIEW_FIELDS = "nameWithOwner,isFork,parent"
+UPSTREAM_PR_FIELDS = "number,url,updatedAt,headRefName,headRepositoryOwner"
+# Branch -> upstream PR hits are short-lived: a PR can be closed or replaced at any time.
+UPSTREAM_CACHE_TTL_SEC = 600
+UPSTREAM_CACHE_ENV = "CODEX_GH_UPSTREAM_CACHE"
+
+
+class GitFacts(NamedTuple):
+    root: Path
+    branch: str | None
+
+
+class UpstreamPR(NamedTuple):
+    repo_slug: str
+    number: int
+    url: str | None
+
+
+_lock = threading.Lock()
+_git_facts: dict[Path, GitFacts | None] = {}
+_repo_info: dict[Path, dict[str, Any] | None] = {}
+
+
+def gh_command(args: list[str], gh_repo: str | None = None) -> list[str]:
+    cmd = ["gh"]
+    if gh_repo:
+        cmd.extend(["-R", gh_repo])
+    cmd.extend(args)
+    return cmd
+
+
+def parse_gh_json(returncode: int, stdout: str) -> Any | None:
+    if returncode != 0:
+        return None
+    try:
+        return json.loads(stdout or "null")
+    except json.JSONDecodeError:
+        return None
+
+
+def gh_json(args: list[str], cwd: Path, gh_repo: str | None = None) -> Any | None:
+    """Run gh and parse its JSON stdout; None when gh fails or prints no JSON."""
+    result = subprocess.run(gh_command(args, gh_repo), cwd=cwd, text=True, capture_output=True)
+    return parse_gh_json(result.returncode, result.stdout)
+
+
+def git_facts(start: Path) -> GitFacts | None:
+    key = start.resolve()
+    with _lock:
+        if key in _git_facts:
+            return _git_facts[key]
+    # One rev-parse answers both; on an unborn branch it fails but still prints the root.
+    result = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel", "--abbrev-ref", "HEAD"],
+        cwd=key,
+        text=True,
+        capture_output=True,
+    )
+    lines = result.stdout.splitlines()
+    facts = None
+    if lines and lines[0].strip():
+        branch = lines[1].strip() if result.returncode == 0 and len(lines) > 1 else ""
+        facts = GitFacts(Path(lines[0].strip()), branch if branch and branch != "HEAD" else None)
+    with _lock:
+        _git_facts[key] = facts
+        if facts is not None:
+            _git_facts.setdefault(facts.root, facts)
+    return facts
+
+
+def find_git_root(start: Path) -> Path | None:
+    facts = git_facts(start)
+    return facts.root if facts else None
+
+
+def current_branch(repo_root: Path) -> str | None:
+    facts = git_facts(repo_root)
+    return facts.branch if facts else None
+
+
+def fetch_repo_info(repo_root: Path) -> dict[str, Any] | None:
+    """`gh repo view` identity and fork parent; one call serves both slug and fork lookups."""
+    key = repo_root.resolve()
+    with _lock:
+        if key in _repo_info:
+            return _repo_info[key]
+    data = gh_json(["repo", "view", "--json", REPO_VIEW_FIELDS], cwd=key)
+    info = data if isinstance(data, dict) else None
+    with _lock:
+        _repo_info[key] = info
+    return info
+
+
+def fetch_repo_slug(repo_root: Path) -> str | None:
+    info = fetch_repo_info(repo_root)
+    slug = info.get("nameWithOwner") if info else None
+    return str(slug) if slug else None
+
+
+def parse_parent_slug(info: dict[str, Any]) -> str | None:
+    parent = info.get("parent")
+    if not isinstance(parent, dict):
+        return None
+    name_with_owner = parent.get("nameWithOwner")
+    if name_with_owner:
+        return str(name_with_owner)
+    owner = parent.get("owner")
+    name = parent.get("name")
+    login = owner.get("login") if isinstance(owner, dict) else None
+    if login and name:
+        return f"{login}/{name}"
+    return None
+
+
+def fork_context(repo_root: Path) -> tuple[str, str, str] | None:
+    """(fork owner, parent slug, branch) when repo_root is a fork checked out on a branch."""
+    info = fetch_repo_info(repo_root)
+    if not info or not bool(info.get("isFork")):
+        return None
+    current = str(info.get("nameWithOwner") or "")
+    owner = current.split("/", 1)[0] if "/" in current else ""
+    parent_slug = parse_parent_slug(info)
+    branch = current_branch(repo_root)
+    if not owner or not parent_slug or not branch:
+        return None
+    return owner, parent_slug, branch
+
+
+def matches_head(pr: dict[str, Any], owner: str, branch: str) -> bool:
+    """Search results are fuzzy; keep PRs whose head is exactly owner:branch (when gh reports it)."""
+    head_ref = pr.get("headRefName")
+    head_owner = pr.get("headRepositoryOwner")
+    login = head_owner.get("login") if isinstance(head_owner, dict) else None
+    if head_ref is not None and head_ref != branch:
+        return False
+    return login is None or str(login).lower() == owner.lower()
+
+
+def fetch_upstream_pr_candidates(
+    repo_root: Path, parent_slug: str, current_owner: str, branch: str
+) -> list[dict[str, Any]] | None:
+    """Run the owner-qualified head lookup and the search lookup concurrently.
+
+    The first one to return a PR whose head matches wins; the head lookup is
+    preferred when both already have answers. None only when both lookups fail.
+    """
+    fields = UPSTREAM_PR_FIELDS
+    lookups = (
+        ["pr", "list", "--state", "open", "--head", f"{current_owner}:{branch}", "--json", fields],
+        ["pr", "list", "--state", "open", "--search", f"head:{branch} author:{current_owner}", "--json", fields],
+    )
+    processes = [
+        subprocess.Popen(
+            gh_command(args, parent_slug),
+            cwd=repo_root,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        for args in lookups
+    ]
+
+    def wait(process: subprocess.Popen[str]) -> Any | None:
+        stdout, _ = process.communicate()
+        return parse_gh_json(process.returncode, stdout)
+
+    with ThreadPoolExecutor(max_workers=len(processes)) as pool:
+        futures = [pool.submit(wait, process) for process in processes]
+        try:
+            failed = 0
+            for future in as_completed(futures):
+                result = future.result()
+                if not isinstance(result, list):
+                    failed += 1
+                    continue
+                if any(isinstance(pr, dict) and matches_head(pr, current_owner, branch) for pr in result):
+                    primary = futures[0].result() if futures[0].done() else None
+                    if isinstance(primary, list) and primary:
+                        result = primary
+                    return [pr for pr in result if isinstance(pr, dict) and matches_head(pr, current_owner, branch)]
+            return None if failed == len(lookups) else []
+        finally:
+            # The lookup that lost the race is not worth waiting for.
+            for process in processes:
+                if process.poll() is None:
+                    process.kill()
+
+
+def upstream_cache_path() -> Path:
+    codex_home = Path(os.environ.get("CODEX_HOME", str(Path.home() / ".codex"))).expanduser()
+    return codex_home / "cache" / "gh-context" / "upstream-prs.json"
+
+
+def load_upstream_cache() -> dict[str, Any]:
+    try:
+        data = json.loads(upstream_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def cached_upstream_pr(key: str) -> UpstreamPR | None:
+    entry = load_upstream_cache().get(key)
+    if not isinstance(entry, dict) or time.time() - float(entry.get("stored_at") or 0) > UPSTREAM_CACHE_TTL_SEC:
+        return None
+    return UpstreamPR(str(entry["repo_slug"]), int(entry["number"]), entry.get("url"))
+
+
+def store_upstream_pr(key: str, upstream: UpstreamPR) -> None:
+    now = time.time()
+    entries = {
+        name: entry
+        for name, entry in load_upstream_cache().items()
+        if isinstance(entry, dict) and now - float(entry.get("stored_at") or 0) <= UPSTREAM_CACHE_TTL_SEC
+    }
+    entries[key] = {**upstream._asdict(), "stored_at": now}
+    path = upstream_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(entries, indent=2))
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def resolve_upstream_pr(repo_root: Path) -> UpstreamPR | None:
+    """Most recently updated open PR in the fork parent whose head is this fork's branch.
+
+    Hits are remembered per checkout and branch for UPSTREAM_CACHE_TTL_SEC, so a
+    repeated run on the same branch skips the gh lookups entirely.
+    """
+    facts = git_facts(repo_root)
+    if facts is None or facts.branch is None:
+        return None
+    key = f"{gh_host()}\0{facts.root}\0{facts.branch}"
+    if os.environ.get(UPSTREAM_CACHE_ENV, "1") != "0":
+        cached = cached_upstream_pr(key)
+        if cached is not None:
+            return cached
+
+    context = fork_context(repo_root)
+    if context is None:
+        return None
+    owner, parent_slug, branch = context
+    prs = fetch_upstream_pr_candidates(repo_root, parent_slug, owner, branch)
+    candidates = [p for p in prs or [] if isinstance(p, dict) and p.get("number")]
+    if not candidates:
+        return None
+    candidates.sort(key=lambda p: str(p.get("updatedAt") or ""), reverse=True)
+    chosen = candidates[0]
+    upstream = UpstreamPR(parent_slug, int(chosen["number"]), str(chosen.get("url") or "") or None)
+    if os.environ.get(UPSTREAM_CACHE_ENV, "1") != "0":
+        store_upstream_pr(key, upstream)
+    return upstream
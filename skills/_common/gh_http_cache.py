@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+# Entries not revalidated for this long are dropped.
+DEFAULT_TTL_SEC = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DISABLE_ENV = "CODEX_GH_HTTP_CACHE"
+# GitHub REST page size when the endpoint does not set per_page.
+DEFAULT_PER_PAGE = 30
+
+# (returncode, stdout bytes, stderr text) for a `gh` invocation with the given arguments.
+GhRunner = Callable[[list[str]], tuple[int, bytes, str]]
+
+
+class HttpStatusError(RuntimeError):
+    def __init__(self, endpoint: str, status: int | None, stderr: str, body: bytes) -> None:
+        self.endpoint = endpoint
+        self.status = status
+        self.stderr = stderr.strip()
+        self.body = body
+        detail = self.stderr or body.decode(errors="replace").strip() or "no output"
+        super().__init__(f"gh api {endpoint} failed (HTTP {status or '?'})\n{detail}")
+
+
+def default_cache_dir() -> Path:
+    codex_home = Path(os.environ.get("CODEX_HOME", str(Path.home() / ".codex"))).expanduser()
+    return codex_home / "cache" / "gh-http"
+
+
+def gh_host() -> str:
+    return os.environ.get("GH_HOST") or "github.com"
+
+
+class ResponseCache:
+    """Size- and TTL-bounded store of gh REST responses with their validators.
+
+    One gzip file per endpoint: a JSON metadata line followed by the raw body.
+    File mtime records the last successful validation and drives LRU eviction.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        *,
+        ttl_sec: float = DEFAULT_TTL_SEC,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool | None = None,
+    ) -> None:
+        self.root = root or default_cache_dir()
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.enabled = os.environ.get(DISABLE_ENV, "1") != "0" if enabled is None else enabled
+        self.stats = {"fresh": 0, "not_modified": 0, "miss": 0}
+        self._lock = threading.Lock()
+        self._pruned = False
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{hashlib.sha256(key.encode()).hexdigest()}.gz"
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def load(self, key: str) -> tuple[dict[str, Any], bytes] | None:
+        if not self.enabled:
+            return None
+        self.prune()
+        path = self._path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if age > self.ttl_sec:
+                path.unlink(missing_ok=True)
+                return None
+            meta_line, _, body = gzip.decompress(path.read_bytes()).partition(b"\n")
+            meta = json.loads(meta_line)
+        except (OSError, EOFError, ValueError):
+            return None
+        if meta.get("key") != key:
+            return None
+        meta["age_sec"] = age
+        return meta, body
+
+    def store(self, key: str, meta: dict[str, Any], body: bytes) -> None:
+        if not self.enabled:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({**meta, "key": key}).encode() + b"\n" + body
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(gzip.compress(payload, compresslevel=6))
+        os.replace(temp_path, path)
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        with self._lock:
+            if self._pruned:
+                return
+            self._pruned = True
+        try:
+            entries = [(path.stat(), path) for path in self.root.glob("*.gz")]
+        except OSError:
+            return
+        now = time.time()
+        kept = []
+        for stat, path in entries:
+            if now - stat.st_mtime > self.ttl_sec:
+                path.unlink(missing_ok=True)
+            else:
+                kept.append((stat, path))
+        total = sum(stat.st_size for stat, _ in kept)
+        for stat, path in sorted(kept, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+
+def split_http_response(output: bytes) -> tuple[int | None, dict[str, str], bytes]:
+    """Split `gh api --include` output into status, lower-cased headers and body."""
+    for separator in (b"\r\n\r\n", b"\n\n"):
+        head, found, body = output.partition(separator)
+        if found:
+            break
+    else:
+        return None, {}, output
+    lines = head.decode(errors="replace").splitlines()
+    status = None
+    if lines and lines[0].startswith("HTTP/"):
+        parts = lines[0].split()
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+    headers: dict[str, str] = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+
+def conditional_get(
+    cache: ResponseCache,
+    endpoint: str,
+    run: GhRunner,
+    *,
+    paginate: bool = False,
+    max_age_sec: float = 0,
+) -> bytes:
+    """GET a REST endpoint through gh, revalidating any cached copy with ETag/Last-Modified.
+
+    Cached bodies younger than max_age_sec are replayed without a request; a 304
+    replays the cached body. Paginated results are returned in `--slurp` form; only
+    single-page results are revalidated, since a 304 on page one says nothing about later pages.
+    A cached page that was full may have gained a second page without page one changing
+    (oldest-first listings), so it is re-fetched in full instead.
+    """
+    key = f"{gh_host()}\0{endpoint}\0{'slurp' if paginate else 'raw'}"
+    cached = cache.load(key)
+    if cached is not None and cached[0]["age_sec"] < max_age_sec:
+        cache.record("fresh")
+        return cached[1]
+
+    if paginate and cached is not None and (cached[0].get("multi_page") or cached[0].get("full_page")):
+        cache.record("miss")
+        return fetch_all_pages(cache, key, endpoint, run)
+
+    args = ["api", "--include"]
+    if cached is not None:
+        meta = cached[0]
+        if meta.get("etag"):
+            args.extend(["-H", f"If-None-Match: {meta['etag']}"])
+        if meta.get("last_modified"):
+            args.extend(["-H", f"If-Modified-Since: {meta['last_modified']}"])
+    returncode, stdout, stderr = run([*args, endpoint])
+    status, headers, body = split_http_response(stdout)
+    if status == 304 and cached is not None:
+        if paginate and 'rel="next"' in headers.get("link", ""):
+            cache.record("miss")
+            return fetch_all_pages(cache, key, endpoint, run)
+        cache.touch(key)
+        cache.record("not_modified")
+        return cached[1]
+    if returncode != 0 or status is None or not 200 <= status < 300:
+        raise HttpStatusError(endpoint, status, stderr, body)
+    cache.record("miss")
+
+    stored_meta: dict[str, Any] = {"etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
+    if paginate:
+        if 'rel="next"' in headers.get("link", ""):
+            return fetch_all_pages(cache, key, endpoint, run)
+        stored_meta["full_page"] = page_is_full(endpoint, body)
+        body = b"[" + (body.strip() or b"null") + b"]"
+    cache.store(key, stored_meta, body)
+    return body
+
+
+def page_is_full(endpoint: str, body: bytes) -> bool:
+    query = parse_qs(urlsplit(endpoint).query)
+    try:
+        per_page = int(query.get("per_page", [DEFAULT_PER_PAGE])[0])
+        items = json.loads(body or b"null")
+    except ValueError:
+        return True
+    return isinstance(items, list) and len(items) >= per_page
+
+
+def fetch_all_pages(cache: ResponseCache, key: str, endpoint: str, run: GhRunner) -> bytes:
+    # Multi-page results have no single validator; keep them for TTL bookkeeping only.
+    returncode, body, stderr = run(["api", "--paginate", "--slurp", endpoint])
+    if returncode != 0:
+        raise HttpStatusError(endpoint, None, stderr, body)
+    cache.store(key, {"multi_page": True}, body)
+    return body
+
+
+def replay_or_fetch(cache: ResponseCache, key: str, fetch: Callable[[], bytes], *, max_age_sec: float) -> bytes:
+    """For requests without validators (GraphQL POSTs): replay a body younger than max_age_sec, else fetch."""
+    key = f"{gh_host()}\0{key}"
+    cached = cache.load(key) if max_age_sec > 0 else None
+    if cached is not None and cached[0]["age_sec"] < max_age_sec:
+        cache.record("fresh")
+        return cached[1]
+    body = fetch()
+    cache.record("miss")
+    if max_age_sec > 0:
+        cache.store(key, {}, body)
+    return body
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import subprocess
 import sys
 import threading
 import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -31,11 +35,21 @@ def _line_excerpt(text: str, limit: int = 2000) -> str:
     return f"{normalized[:limit]}...(truncated)"
 
 
+def _atomic_write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(text)
+    os.replace(temp_path, path)
+
+
 @dataclass(frozen=True)
 class ProcessOutput:
     returncode: int
     stdout: str
     stderr: str
+    stdout_path: Path | None = None
+    stderr_path: Path | None = None
+    usage: dict[str, float] | None = None
 
 
 class StatusTracker:
@@ -45,14 +59,26 @@ class StatusTracker:
         status_path: Path | None,
         script_name: str,
         heartbeat_interval_sec: float = 2.0,
+        coalesce_interval_sec: float = 0.25,
+        event_log_path: Path | None = None,
         initial_state: dict[str, Any] | None = None,
     ) -> None:
         self.status_path = status_path
+        self.event_log_path = event_log_path
         self.script_name = script_name
         self.heartbeat_interval_sec = heartbeat_interval_sec
+        self.coalesce_interval_sec = coalesce_interval_sec
         self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
         self._heartbeat_stop = threading.Event()
         self._heartbeat_thread: threading.Thread | None = None
+        # State mutations only mark the snapshot dirty; a single writer thread
+        # coalesces them and rewrites the file at most once per interval.
+        self._dirty = False
+        self._pending_events: list[dict[str, Any]] = []
+        self._writer_wake = threading.Event()
+        self._writer_stop = threading.Event()
+        self._writer_thread: threading.Thread | None = None
         self.state: dict[str, Any] = {
             "script": script_name,
             "started_at": _timestamp(),
@@ -61,46 +87,95 @@ class StatusTracker:
             "phase": "initializing",
             "message": "",
             "current_step": None,
+            "running_steps": [],
             "steps": [],
             "artifacts": {},
         }
         if initial_state:
             self.state.update(initial_state)
-        self._write()
+        if status_path is not None or event_log_path is not None:
+            self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer_thread.start()
+            atexit.register(self.close)
+        with self._lock:
+            self._write("started")
+        self.flush()
 
     def log(self, message: str) -> None:
-        print(f"[{self.script_name}] {message}", file=sys.stderr, flush=True)
+        # One write per line so concurrent steps never interleave within a line.
+        sys.stderr.write(f"[{self.script_name}] {message}\n")
+        sys.stderr.flush()
 
-    def _write(self) -> None:
-        if self.status_path is None:
+    def _write(self, event: str | None = None, **fields: Any) -> None:
+        # Callers hold self._lock; the file itself is written by the writer thread.
+        if self._writer_thread is None:
             return
-        self.status_path.parent.mkdir(parents=True, exist_ok=True)
         self.state["updated_at"] = _timestamp()
-        self.status_path.write_text(json.dumps(self.state, indent=2))
+        self._dirty = True
+        if event is not None and self.event_log_path is not None:
+            self._pending_events.append({"at": self.state["updated_at"], "event": event, **fields})
+        self._writer_wake.set()
 
-    def _update_current_step(self, **updates: Any) -> None:
-        current_step = self.state.get("current_step")
-        if not isinstance(current_step, dict):
-            return
-        current_step.update(updates)
+    def _writer_loop(self) -> None:
+        while not self._writer_stop.is_set():
+            self._writer_wake.wait()
+            self._writer_stop.wait(self.coalesce_interval_sec)
+            self.flush()
+
+    def flush(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                self._writer_wake.clear()
+                snapshot = json.dumps(self.state, indent=2) if self._dirty and self.status_path is not None else None
+                self._dirty = False
+                events, self._pending_events = self._pending_events, []
+            if events and self.event_log_path is not None:
+                self.event_log_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.event_log_path.open("a") as handle:
+                    handle.writelines(f"{json.dumps(event)}\n" for event in events)
+            if snapshot is not None and self.status_path is not None:
+                _atomic_write_text(self.status_path, snapshot)
 
-    def _heartbeat_loop(self, step_name: str) -> None:
-        while not self._heartbeat_stop.wait(self.heartbeat_interval_sec):
+    def close(self) -> None:
+        # The exit hook holds a reference to this tracker; drop it once closed.
+        atexit.unregister(self.close)
+        self._stop_heartbeat()
+        if self._writer_thread is not None:
+            self._writer_stop.set()
+            self._writer_wake.set()
+            self._writer_thread.join(timeout=1.0)
+        self.flush()
+
+    def _running_steps(self) -> list[dict[str, Any]]:
+        steps = self.state.get("steps")
+        if not isinstance(steps, list):
+            return []
+        return [step for step in steps if isinstance(step, dict) and step.get("status") == "running"]
+
+    def _heartbeat_loop(self, stop: threading.Event) -> None:
+        # One heartbeat thread serves every running step; it exits on its own
+        # once no step is running so concurrent steps never stop each other's.
+        while not stop.wait(self.heartbeat_interval_sec):
             with self._lock:
-                current_step = self.state.get("current_step")
-                if not isinstance(current_step, dict) or current_step.get("name") != step_name:
+                running = self._running_steps()
+                if not running:
+                    if self._heartbeat_thread is threading.current_thread():
+                        self._heartbeat_thread = None
                     break
-                heartbeat_count = int(current_step.get("heartbeat_count", 0)) + 1
-                current_step["heartbeat_count"] = heartbeat_count
-                current_step["heartbeat_at"] = _timestamp()
+                heartbeat_at = _timestamp()
+                for step in running:
+                    step["heartbeat_count"] = int(step.get("heartbeat_count", 0)) + 1
+                    step["heartbeat_at"] = heartbeat_at
                 self._write()
 
     def _stop_heartbeat(self) -> None:
-        self._heartbeat_stop.set()
-        if self._heartbeat_thread is not None:
-            self._heartbeat_thread.join(timeout=1.0)
-        self._heartbeat_stop = threading.Event()
-        self._heartbeat_thread = None
+        with self._lock:
+            thread = self._heartbeat_thread
+            self._heartbeat_thread = None
+            self._heartbeat_stop.set()
+            self._heartbeat_stop = threading.Event()
+        if thread is not None:
+            thread.join(timeout=1.0)
 
     def set_phase(self, phase: str, *, message: str = "", **updates: Any) -> None:
         with self._lock:
@@ -108,7 +183,7 @@ class StatusTracker:
             if message:
                 self.state["message"] = message
             self.state.update(updates)
-            self._write()
+            self._write("phase", phase=phase, message=message)
         if message:
             self.log(message)
 
@@ -117,10 +192,9 @@ class StatusTracker:
             artifacts = self.state.setdefault("artifacts", {})
             if isinstance(artifacts, dict):
                 artifacts[name] = value
-            self._write()
+            self._write("artifact", name=name, value=value)
 
     def start_step(self, step_name: str, *, command: list[str] | tuple[str, ...], message: str = "") -> None:
-        self._stop_heartbeat()
         with self._lock:
             step_record = {
                 "name": step_name,
@@ -135,13 +209,15 @@ class StatusTracker:
             steps = self.state.setdefault("steps", [])
             if isinstance(steps, list):
                 steps.append(step_record)
-            self._write()
-            self._heartbeat_thread = threading.Thread(
-                target=self._heartbeat_loop,
-                args=(step_name,),
-                daemon=True,
-            )
-            self._heartbeat_thread.start()
+            self.state["running_steps"] = [step["name"] for step in self._running_steps()]
+            self._write("step_started", step=step_name, command=list(command))
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat_loop,
+                    args=(self._heartbeat_stop,),
+                    daemon=True,
+                )
+                self._heartbeat_thread.start()
         self.log(message or f"start step: {step_name}")
 
     def finish_step(
@@ -152,32 +228,44 @@ class StatusTracker:
         stdout: str = "",
         stderr: str = "",
         message: str = "",
+        usage: dict[str, float] | None = None,
     ) -> None:
         status = "passed" if returncode == 0 else "failed"
-        self._stop_heartbeat()
         with self._lock:
-            steps = self.state.get("steps")
-            if isinstance(steps, list):
-                for step in reversed(steps):
-                    if isinstance(step, dict) and step.get("name") == step_name and step.get("status") == "running":
-                        step["status"] = status
-                        step["returncode"] = returncode
-                        step["finished_at"] = _timestamp()
-                        step["stdout_excerpt"] = _line_excerpt(stdout)
-                        step["stderr_excerpt"] = _line_excerpt(stderr)
-                        break
-            self._update_current_step(
-                status=status,
-                returncode=returncode,
-                finished_at=_timestamp(),
-                stdout_excerpt=_line_excerpt(stdout),
-                stderr_excerpt=_line_excerpt(stderr),
-            )
-            self.state["current_step"] = None
+            finished_step: dict[str, Any] | None = None
+            for step in reversed(self._running_steps()):
+                if step.get("name") == step_name:
+                    step["status"] = status
+                    step["returncode"] = returncode
+                    step["finished_at"] = _timestamp()
+                    step["stdout_excerpt"] = _line_excerpt(stdout)
+                    step["stderr_excerpt"] = _line_excerpt(stderr)
+                    if usage is not None:
+                        step["usage"] = usage
+                    finished_step = step
+                    break
+            running = self._running_steps()
+            current_step = self.state.get("current_step")
+            if current_step is finished_step or finished_step is None:
+                self.state["current_step"] = running[-1] if running else None
+            self.state["running_steps"] = [step["name"] for step in running]
             self.state["message"] = message or f"{step_name} {status}"
-            self._write()
+            self._write("step_finished", step=step_name, status=status, returncode=returncode)
         self.log(message or f"finish step: {step_name} ({status})")
 
+    def step_timings(self) -> list[dict[str, Any]]:
+        with self._lock:
+            steps = self.state.get("steps")
+            if not isinstance(steps, list):
+                return []
+            # Re-run steps (watch mode) keep only their latest timing.
+            latest = {
+                step["name"]: {"name": step["name"], "status": step.get("status"), **step["usage"]}
+                for step in steps
+                if isinstance(step.get("usage"), dict)
+            }
+            return list(latest.values())
+
     def finish(self, final_status: str, *, message: str = "", **updates: Any) -> None:
         self._stop_heartbeat()
         with self._lock:
@@ -186,30 +274,129 @@ class StatusTracker:
             if message:
                 self.state["message"] = message
             self.state.update(updates)
-            self._write()
+            self._write("finished", status=final_status, message=message)
+        self.flush()
         if message:
             self.log(message)
 
 
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+class _StreamCapture:
+    """Keeps the whole stream, or only the first/last limit_bytes // 2 bytes when a limit is set.
+
+    spill_path receives the full stream either way.
+    """
+
+    def __init__(self, *, limit_bytes: int | None, spill_path: Path | None) -> None:
+        self.limit_bytes = limit_bytes
+        self.spill_path = spill_path
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill = None
+        if spill_path is not None:
+            spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = spill_path.open("wb")
+
+    def append(self, chunk: bytes) -> None:
+        self.total_bytes += len(chunk)
+        if self._spill is not None:
+            self._spill.write(chunk)
+        if self.limit_bytes is None:
+            self._head += chunk
+            return
+        head_limit = self.limit_bytes // 2
+        if len(self._head) < head_limit:
+            take = head_limit - len(self._head)
+            self._head += chunk[:take]
+            chunk = chunk[take:]
+        if chunk:
+            self._tail += chunk
+            overflow = len(self._tail) - (self.limit_bytes - head_limit)
+            if overflow > 0:
+                del self._tail[:overflow]
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def text(self) -> str:
+        omitted = self.total_bytes - len(self._head) - len(self._tail)
+        head = self._head.decode("utf-8", errors="replace")
+        tail = self._tail.decode("utf-8", errors="replace")
+        if omitted <= 0:
+            return head + tail
+        return f"{head}\n...({omitted} bytes omitted)...\n{tail}"
+
+
+def _relay_line(line: bytes, *, step_name: str, stream_name: str, tracker: StatusTracker | None) -> None:
+    text = line.decode("utf-8", errors="replace").rstrip()
+    if tracker is not None:
+        tracker.log(f"{step_name} {stream_name}: {text}")
+    else:
+        sys.stderr.write(f"[{step_name}:{stream_name}] {text}\n")
+        sys.stderr.flush()
+
+
 def _pump_stream(
     *,
     stream: Any,
-    buffer: list[str],
+    capture: _StreamCapture,
     step_name: str,
     stream_name: str,
     relay: bool,
     tracker: StatusTracker | None,
 ) -> None:
+    # A partial line longer than the capture limit (\r progress bars, minified blobs) is
+    # relayed truncated and the rest of it dropped, so the relay buffer stays bounded too.
+    limit = capture.limit_bytes
+    pending = b""
+    dropping = False
     try:
-        for line in iter(stream.readline, ""):
-            buffer.append(line)
-            if relay:
-                if tracker is not None:
-                    tracker.log(f"{step_name} {stream_name}: {line.rstrip()}")
-                else:
-                    print(f"[{step_name}:{stream_name}] {line.rstrip()}", file=sys.stderr, flush=True)
+        for chunk in iter(lambda: stream.read1(_READ_CHUNK_BYTES), b""):
+            capture.append(chunk)
+            if not relay:
+                continue
+            *lines, rest = chunk.split(b"\n")
+            for line in lines:
+                if not dropping:
+                    _relay_line(pending + line, step_name=step_name, stream_name=stream_name, tracker=tracker)
+                pending = b""
+                dropping = False
+            if dropping:
+                continue
+            pending += rest
+            if limit is not None and len(pending) > limit:
+                truncated = pending[:limit] + b"...(truncated)"
+                _relay_line(truncated, step_name=step_name, stream_name=stream_name, tracker=tracker)
+                pending = b""
+                dropping = True
+        if relay and pending:
+            _relay_line(pending, step_name=step_name, stream_name=stream_name, tracker=tracker)
     finally:
         stream.close()
+        capture.close()
+
+
+def _wait_with_usage(process: subprocess.Popen[bytes], started: float) -> tuple[int, dict[str, float]]:
+    # wait4 reports this child's own rusage (plus its waited-for descendants), which
+    # RUSAGE_CHILDREN cannot attribute when several steps run concurrently.
+    if not hasattr(os, "wait4"):
+        returncode = process.wait()
+        return returncode, {"wall_sec": round(time.monotonic() - started, 3)}
+    _, wait_status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    max_rss_kib = rusage.ru_maxrss / 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    return process.returncode, {
+        "wall_sec": round(time.monotonic() - started, 3),
+        "cpu_user_sec": round(rusage.ru_utime, 3),
+        "cpu_sys_sec": round(rusage.ru_stime, 3),
+        "max_rss_mb": round(max_rss_kib / 1024, 1),
+    }
 
 
 def run_command_capture(
@@ -221,54 +408,108 @@ def run_command_capture(
     tracker: StatusTracker | None = None,
     relay_stdout_to_stderr: bool = False,
     relay_stderr: bool = True,
+    capture_limit_bytes: int | None = None,
+    spill_dir: Path | None = None,
 ) -> ProcessOutput:
     if tracker is not None:
         tracker.start_step(step_name, command=command)
 
+    started = time.monotonic()
     process = subprocess.Popen(
         command,
         cwd=cwd,
-        text=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         env=env,
-        bufsize=1,
     )
 
-    stdout_chunks: list[str] = []
-    stderr_chunks: list[str] = []
-    stdout_thread = threading.Thread(
-        target=_pump_stream,
-        kwargs={
-            "stream": process.stdout,
-            "buffer": stdout_chunks,
-            "step_name": step_name,
-            "stream_name": "stdout",
-            "relay": relay_stdout_to_stderr,
-            "tracker": tracker,
-        },
-        daemon=True,
-    )
-    stderr_thread = threading.Thread(
-        target=_pump_stream,
-        kwargs={
-            "stream": process.stderr,
-            "buffer": stderr_chunks,
-            "step_name": step_name,
-            "stream_name": "stderr",
-            "relay": relay_stderr,
-            "tracker": tracker,
-        },
-        daemon=True,
-    )
-    stdout_thread.start()
-    stderr_thread.start()
-    returncode = process.wait()
-    stdout_thread.join()
-    stderr_thread.join()
-
-    stdout = "".join(stdout_chunks)
-    stderr = "".join(stderr_chunks)
+    captures = {
+        stream_name: _StreamCapture(
+            limit_bytes=capture_limit_bytes,
+            spill_path=spill_dir / f"{step_name}.{stream_name}.log" if spill_dir is not None else None,
+        )
+        for stream_name in ("stdout", "stderr")
+    }
+    threads = [
+        threading.Thread(
+            target=_pump_stream,
+            kwargs={
+                "stream": stream,
+                "capture": captures[stream_name],
+                "step_name": step_name,
+                "stream_name": stream_name,
+                "relay": relay,
+                "tracker": tracker,
+            },
+            daemon=True,
+        )
+        for stream, stream_name, relay in (
+            (process.stdout, "stdout", relay_stdout_to_stderr),
+            (process.stderr, "stderr", relay_stderr),
+        )
+    ]
+    for thread in threads:
+        thread.start()
+    returncode, usage = _wait_with_usage(process, started)
+    for thread in threads:
+        thread.join()
+
+    stdout = captures["stdout"].text()
+    stderr = captures["stderr"].text()
     if tracker is not None:
-        tracker.finish_step(step_name, returncode=returncode, stdout=stdout, stderr=stderr)
-    return ProcessOutput(returncode=returncode, stdout=stdout, stderr=stderr)
+        tracker.finish_step(step_name, returncode=returncode, stdout=stdout, stderr=stderr, usage=usage)
+    return ProcessOutput(
+        returncode=returncode,
+        stdout=stdout,
+        stderr=stderr,
+        stdout_path=captures["stdout"].spill_path,
+        stderr_path=captures["stderr"].spill_path,
+        usage=usage,
+    )
+
+
+@dataclass(frozen=True)
+class GraphStep:
+    name: str
+    action: Callable[[], Any]
+    depends_on: tuple[str, ...] = ()
+
+
+def run_step_graph(steps: Sequence[GraphStep], *, max_workers: int = 4) -> dict[str, Any]:
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("step graph has duplicate step names")
+    for step in steps:
+        unknown = [dependency for dependency in step.depends_on if dependency not in by_name]
+        if unknown:
+            raise ValueError(f"step {step.name} depends on unknown steps: {', '.join(unknown)}")
+
+    max_workers = max(1, max_workers)
+    results: dict[str, Any] = {}
+    errors: dict[str, BaseException] = {}
+    pending = list(steps)
+    running: dict[Future[Any], GraphStep] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # After a failure no new step starts; already running steps drain.
+            if not errors:
+                for step in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if all(dependency in results for dependency in step.depends_on):
+                        pending.remove(step)
+                        running[pool.submit(step.action)] = step
+            if not running:
+                if errors:
+                    break
+                raise ValueError(f"step graph has a dependency cycle: {', '.join(step.name for step in pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    results[step.name] = future.result()
+                except Exception as exc:
+                    errors[step.name] = exc
+    if errors:
+        raise errors[next(step.name for step in steps if step.name in errors)]
+    return results
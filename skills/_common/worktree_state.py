@@ -0,0 +1,52 @@
+"""Fingerprint of a checkout's exact contents: HEAD plus a hash of uncommitted changes.
+
+Reports stamped with it can be reused only while both values still match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Any
+
+# Workflow scratch output and coverage data files land inside the checkout and must not invalidate reports.
+IGNORED_PREFIXES = (".codex_tmp/", ".coverage")
+
+
+def _git(repo_root: Path, *args: str, stdin: bytes | None = None) -> bytes | None:
+    result = subprocess.run(["git", *args], cwd=repo_root, input=stdin, capture_output=True)
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def worktree_fingerprint(repo_root: Path) -> dict[str, str | None]:
+    """{"head_sha", "worktree_hash"}; both None when HEAD or the diff cannot be read."""
+    head = _git(repo_root, "rev-parse", "--verify", "-q", "HEAD")
+    diff = _git(repo_root, "diff", "HEAD", "--binary", "--no-ext-diff", "--no-color") if head else None
+    untracked = _git(repo_root, "ls-files", "--others", "--exclude-standard", "-z")
+    if head is None or diff is None or untracked is None:
+        return {"head_sha": None, "worktree_hash": None}
+
+    digest = hashlib.sha256(diff)
+    paths = [
+        path
+        for path in untracked.decode(errors="surrogateescape").split("\0")
+        if path and not path.startswith(IGNORED_PREFIXES)
+    ]
+    if paths:
+        hashed = _git(repo_root, "hash-object", "--stdin-paths", stdin="\n".join(paths).encode(errors="surrogateescape"))
+        if hashed is None:
+            return {"head_sha": None, "worktree_hash": None}
+        for path, blob in zip(paths, hashed.decode().split()):
+            digest.update(f"\0{path}\0{blob}".encode(errors="surrogateescape"))
+    return {"head_sha": head.decode().strip(), "worktree_hash": digest.hexdigest()}
+
+
+def is_fresh(stamped: dict[str, Any], current: dict[str, str | None]) -> bool:
+    return (
+        current["head_sha"] is not None
+        and stamped.get("head_sha") == current["head_sha"]
+        and stamped.get("worktree_hash") == current["worktree_hash"]
+    )
@@ -1,14 +1,203 @@
 import argparse
 import json
 import re
+import subprocess
+from bisect import bisect_right
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
 TEST_RE = re.compile(r"(^|/)(tests?|__tests__)/|\.(test|spec)\.")
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+READ_CHUNK_CHARS = 1 << 20
+WHITESPACE = " \t\n\r"
+
+
+def changed_line_ranges(diff_base: str) -> dict[str, list[tuple[int, int]]] | str:
+    """Changed line spans per path, or git's error message when the diff cannot be taken."""
+    result = subprocess.run(
+        # Explicit prefixes: diff.noprefix / diff.mnemonicPrefix would otherwise change the "+++ b/" lines.
+        [
+            "git",
+            "diff",
+            "--unified=0",
+            "--no-color",
+            "--no-ext-diff",
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            diff_base,
+            "--",
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        return error[0] if error else f"git diff exited with status {result.returncode}"
+    ranges: dict[str, list[tuple[int, int]]] = {}
+    current: str | None = None
+    for line in result.stdout.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            current = target[2:] if target.startswith("b/") else None
+            continue
+        match = HUNK_RE.match(line)
+        if match is None or current is None:
+            continue
+        start = int(match.group(1))
+        count = int(match.group(2)) if match.group(2) is not None else 1
+        if count:
+            ranges.setdefault(current, []).append((start, start + count - 1))
+    return ranges
+
+
+def build_interval_index(ranges: list[tuple[int, int]]) -> tuple[list[int], list[int]]:
+    starts: list[int] = []
+    ends: list[int] = []
+    for start, end in sorted(ranges):
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def in_intervals(index: tuple[list[int], list[int]], line: int) -> bool:
+    starts, ends = index
+    position = bisect_right(starts, line) - 1
+    return position >= 0 and line <= ends[position]
+
+
+def format_line_ranges(lines: list[int]) -> str:
+    spans: list[list[int]] = []
+    for line in lines:
+        if spans and line == spans[-1][1] + 1:
+            spans[-1][1] = line
+        else:
+            spans.append([line, line])
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in spans)
+
+
+class _ChunkedJson:
+    def __init__(self, handle: Any) -> None:
+        self.handle = handle
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.handle.read(READ_CHUNK_CHARS)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("unexpected end of coverage JSON")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in coverage JSON")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A bare number at the buffer edge may be cut short; containers and strings cannot.
+            if end == len(self.buffer) and not isinstance(value, (dict, list, str)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def iter_coverage_files(path: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    # Stream the top-level "files" object one entry at a time so memory stays bounded
+    # by the largest single file entry rather than the whole report.
+    with path.open(encoding="utf-8") as handle:
+        reader = _ChunkedJson(handle)
+        for key in reader.members():
+            if key != "files":
+                reader.value()
+                continue
+            for file_path in reader.members():
+                yield file_path, reader.value()
+
+
+def report_changed_lines(coverage_json: Path, diff_base: str, top: int) -> None:
+    changed = changed_line_ranges(diff_base)
+    if isinstance(changed, str):
+        # An unresolvable base (e.g. no origin remote) must not fail the code-health run.
+        print(f"changed-line coverage unavailable: {changed}")
+        return
+    indexes = {
+        path: build_interval_index(ranges)
+        for path, ranges in changed.items()
+        if not TEST_RE.search(path)
+    }
+    rows = []
+    for fp, info in iter_coverage_files(coverage_json):
+        index = indexes.get(fp)
+        if index is None:
+            continue
+        missing = [line for line in info.get("missing_lines", []) if in_intervals(index, line)]
+        executed = sum(1 for line in info.get("executed_lines", []) if in_intervals(index, line))
+        rows.append((len(missing), executed + len(missing), fp, missing))
+
+    total_missing = sum(row[0] for row in rows)
+    total_statements = sum(row[1] for row in rows)
+    print(
+        f"Changed-line coverage vs {diff_base}: {total_statements - total_missing}/{total_statements} "
+        f"changed statements covered across {len(rows)} measured files"
+    )
+    rows.sort(key=lambda row: (-row[0], row[2]))
+    uncovered = [row for row in rows if row[0]]
+    if not uncovered:
+        print("No uncovered changed lines.")
+        return
+    print(f"\nTop {top} files by uncovered changed lines:")
+    for miss, stmts, fp, missing in uncovered[:top]:
+        print(f"uncovered={miss:4d}  changed_stmts={stmts:4d}  {fp}: {format_line_ranges(missing)}")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Coverage hotspot summary")
     parser.add_argument("--coverage-json", type=Path, default=Path("coverage.json"))
+    parser.add_argument(
+        "--diff-base",
+        default=None,
+        help="Report only uncovered lines changed since this ref (git diff --unified=0 hunks)",
+    )
+    parser.add_argument("--top", type=int, default=20)
     args = parser.parse_args()
 
     p = args.coverage_json
@@ -16,6 +205,10 @@ def main() -> None:
         print(f"{p} not found.")
         return
 
+    if args.diff_base:
+        report_changed_lines(p, args.diff_base, args.top)
+        return
+
     obj = json.loads(p.read_text())
     files = obj["files"]
     rows = []
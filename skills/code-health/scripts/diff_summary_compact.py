@@ -7,6 +7,7 @@ import re
 import subprocess
 
 TEST_RE = re.compile(r"(^|/)(tests?|__tests__)/|\.test\.|\.spec\.")
+DEEP_VIEW_MARKER = "=== deep view (all files) ==="
 
 
 def git_output(*args: str) -> str | None:
@@ -47,18 +48,68 @@ def resolve_fork_point(base: str) -> str:
     )
 
 
-def summarize_numstat(numstat: str) -> tuple[int, int, int, int]:
-    """Return (add, rem, tadd, trem) from numstat."""
-    add = rem = tadd = trem = 0
-    for line in numstat.strip().splitlines():
-        parts = line.split("\t")
+DiffEntry = tuple[str, str, int | None, int | None]
+
+
+def parse_diff_z(output: str) -> list[DiffEntry]:
+    """Parse `git diff -z --raw --numstat` into (status, path, added, removed) entries."""
+    statuses: dict[str, str] = {}
+    counts: dict[str, tuple[int | None, int | None]] = {}
+    order: list[str] = []
+    tokens = output.split("\0")
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+        if not token:
+            continue
+        if token.startswith(":"):
+            status = token.split()[-1]
+            if status[:1] in ("R", "C"):
+                path = tokens[index + 1]
+                index += 2
+            else:
+                path = tokens[index]
+                index += 1
+            if path not in statuses:
+                order.append(path)
+            statuses[path] = status
+            continue
+        parts = token.split("\t", 2)
         if len(parts) < 3:
             continue
-        a, r = parts[0], parts[1]
-        if not a.isdigit() or not r.isdigit():
+        path = parts[2]
+        if not path:
+            # Renames/copies carry old and new paths as separate fields.
+            path = tokens[index + 1]
+            index += 2
+        added = int(parts[0]) if parts[0].isdigit() else None
+        removed = int(parts[1]) if parts[1].isdigit() else None
+        counts[path] = (added, removed)
+    return [(statuses[path], path, *counts.get(path, (None, None))) for path in order]
+
+
+def git_diff_entries(*args: str) -> list[DiffEntry]:
+    result = subprocess.run(
+        ["git", "diff", "-z", "--raw", "--numstat", *args],
+        capture_output=True,
+        text=True,
+    )
+    return parse_diff_z(result.stdout)
+
+
+def filter_entries(entries: list[DiffEntry], all_files: bool) -> list[DiffEntry]:
+    if all_files:
+        return entries
+    return [entry for entry in entries if entry[1].endswith(".py")]
+
+
+def summarize_numstat(entries: list[DiffEntry]) -> tuple[int, int, int, int]:
+    """Return (add, rem, tadd, trem) from diff entries."""
+    add = rem = tadd = trem = 0
+    for _, path, a_val, r_val in entries:
+        if a_val is None or r_val is None:
             continue
-        path = "\t".join(parts[2:])
-        a_val, r_val = int(a), int(r)
         if TEST_RE.search(path):
             tadd += a_val
             trem += r_val
@@ -68,35 +119,22 @@ def summarize_numstat(numstat: str) -> tuple[int, int, int, int]:
     return add, rem, tadd, trem
 
 
-def parse_numstat_entries(numstat: str) -> list[tuple[str, int, int, bool]]:
-    entries: list[tuple[str, int, int, bool]] = []
-    for line in numstat.strip().splitlines():
-        parts = line.split("\t")
-        if len(parts) < 3:
-            continue
-        a, r = parts[0], parts[1]
-        if not a.isdigit() or not r.isdigit():
-            continue
-        path = "\t".join(parts[2:])
-        is_test = bool(TEST_RE.search(path))
-        entries.append((path, int(a), int(r), is_test))
-    return entries
+def parse_numstat_entries(entries: list[DiffEntry]) -> list[tuple[str, int, int, bool]]:
+    return [
+        (path, a_val, r_val, bool(TEST_RE.search(path)))
+        for _, path, a_val, r_val in entries
+        if a_val is not None and r_val is not None
+    ]
 
 
-def summarize_name_status(name_status: str) -> tuple[list[str], list[str], list[str], list[str]]:
-    """Return (new_files, del_files, new_test_files, del_test_files) from name-status."""
+def summarize_name_status(entries: list[DiffEntry]) -> tuple[list[str], list[str], list[str], list[str]]:
+    """Return (new_files, del_files, new_test_files, del_test_files) from diff entries."""
     new_files: list[str] = []
     del_files: list[str] = []
     new_test_files: list[str] = []
     del_test_files: list[str] = []
 
-    for line in name_status.strip().splitlines():
-        if not line:
-            continue
-        parts = line.split("\t")
-        if len(parts) < 2:
-            continue
-        status, path = parts[0], parts[1]
+    for status, path, _, _ in entries:
         is_test = bool(TEST_RE.search(path))
 
         if status == "A":
@@ -116,17 +154,17 @@ def summarize_name_status(name_status: str) -> tuple[list[str], list[str], list[
 def count_untracked() -> tuple[list[str], list[str]]:
     """Return (untracked_files, untracked_test_files)."""
     result = subprocess.run(
-        ["git", "status", "--porcelain"],
+        ["git", "status", "--porcelain", "-z"],
         capture_output=True,
         text=True,
     )
     files: list[str] = []
     test_files: list[str] = []
 
-    for line in result.stdout.strip().splitlines():
-        if not line.startswith("?? "):
+    for record in result.stdout.split("\0"):
+        if not record.startswith("?? "):
             continue
-        path = line[3:]
+        path = record[3:]
         if not path.endswith(".py"):
             continue
         if TEST_RE.search(path):
@@ -195,26 +233,48 @@ def print_top_churn(entries: list[tuple[str, int, int, bool]], label: str, top_n
         print(f"  {total:5d}  +{add:4d}/-{rem:4d}  {path}")
 
 
-def git_diff_numstat(compare_ref: str | None, staged: bool, all_files: bool) -> str:
-    cmd = ["git", "diff", "--numstat"]
-    if staged:
-        cmd.append("--staged")
-    elif compare_ref:
-        cmd.append(f"{compare_ref}..HEAD")
-    if not all_files:
-        cmd.extend(["--", "*.py"])
-    return subprocess.run(cmd, capture_output=True, text=True).stdout
+def print_view(
+    diffs: dict[str, list[DiffEntry]],
+    untracked: tuple[list[str], list[str]],
+    *,
+    fork: str,
+    base: str,
+    all_files: bool,
+    deep: bool,
+    top_files: int,
+) -> None:
+    branch = filter_entries(diffs["branch"], all_files)
+    for label, entries in (
+        (f"Branch fork point ({fork}..HEAD; upstream {base})", branch),
+        ("Staged", filter_entries(diffs["staged"], all_files)),
+        ("Working", filter_entries(diffs["working"], all_files)),
+    ):
+        add, rem, tadd, trem = summarize_numstat(entries)
+        new_f, del_f, new_tf, del_tf = summarize_name_status(entries)
+        print_diff(label, add, rem, tadd, trem, new_f, del_f, new_tf, del_tf)
 
+    # Untracked files (working directory only)
+    untracked_files, untracked_test = untracked
+    if untracked_files or untracked_test:
+        print("  Untracked:")
+        if untracked_files:
+            print(f"    Non-test: {len(untracked_files)} files")
+            for f in untracked_files[:3]:
+                print(f"      ? {f}")
+            if len(untracked_files) > 3:
+                print(f"      ... and {len(untracked_files) - 3} more")
+        if untracked_test:
+            print(f"    Test: {len(untracked_test)} files")
+            for f in untracked_test[:3]:
+                print(f"      ? {f}")
+            if len(untracked_test) > 3:
+                print(f"      ... and {len(untracked_test) - 3} more")
 
-def git_diff_name_status(compare_ref: str | None, staged: bool, all_files: bool) -> str:
-    cmd = ["git", "diff", "--name-status"]
-    if staged:
-        cmd.append("--staged")
-    elif compare_ref:
-        cmd.append(f"{compare_ref}..HEAD")
-    if not all_files:
-        cmd.extend(["--", "*.py"])
-    return subprocess.run(cmd, capture_output=True, text=True).stdout
+    if deep:
+        entries = parse_numstat_entries(branch)
+        print(f"\nTop churn files ({fork}..HEAD, add+del; upstream {base}):")
+        print_top_churn(entries, "  Non-test", top_files, is_test=False)
+        print_top_churn(entries, "  Test", top_files, is_test=True)
 
 
 def main() -> None:
@@ -223,57 +283,38 @@ def main() -> None:
     parser.add_argument("--top-files", type=int, default=10)
     parser.add_argument("--all-files", action="store_true")
     parser.add_argument("--deep", action="store_true")
+    parser.add_argument(
+        "--both-views",
+        action="store_true",
+        help=f"Print the default view, then {DEEP_VIEW_MARKER!r}, then the --deep --all-files view",
+    )
     args = parser.parse_args()
 
     base = resolve_base_ref(args.base)
     fork = resolve_fork_point(base)
-    all_files = args.all_files
-
-    # Branch diff
-    numstat = git_diff_numstat(fork, staged=False, all_files=all_files)
-    name_status = git_diff_name_status(fork, staged=False, all_files=all_files)
-    add, rem, tadd, trem = summarize_numstat(numstat)
-    new_f, del_f, new_tf, del_tf = summarize_name_status(name_status)
-    print_diff(f"Branch fork point ({fork}..HEAD; upstream {base})", add, rem, tadd, trem, new_f, del_f, new_tf, del_tf)
-
-    # Staged diff
-    numstat = git_diff_numstat(compare_ref=None, staged=True, all_files=all_files)
-    name_status = git_diff_name_status(compare_ref=None, staged=True, all_files=all_files)
-    add, rem, tadd, trem = summarize_numstat(numstat)
-    new_f, del_f, new_tf, del_tf = summarize_name_status(name_status)
-    print_diff("Staged", add, rem, tadd, trem, new_f, del_f, new_tf, del_tf)
-
-    # Working diff
-    numstat = git_diff_numstat(compare_ref=None, staged=False, all_files=all_files)
-    name_status = git_diff_name_status(compare_ref=None, staged=False, all_files=all_files)
-    add, rem, tadd, trem = summarize_numstat(numstat)
-    new_f, del_f, new_tf, del_tf = summarize_name_status(name_status)
-
-    # Untracked files (working directory only)
-    untracked, untracked_test = count_untracked()
-
-    print_diff("Working", add, rem, tadd, trem, new_f, del_f, new_tf, del_tf)
 
-    if untracked or untracked_test:
-        print("  Untracked:")
-        if untracked:
-            print(f"    Non-test: {len(untracked)} files")
-            for f in untracked[:3]:
-                print(f"      ? {f}")
-            if len(untracked) > 3:
-                print(f"      ... and {len(untracked) - 3} more")
-        if untracked_test:
-            print(f"    Test: {len(untracked_test)} files")
-            for f in untracked_test[:3]:
-                print(f"      ? {f}")
-            if len(untracked_test) > 3:
-                print(f"      ... and {len(untracked_test) - 3} more")
-
-    if args.deep:
-        entries = parse_numstat_entries(git_diff_numstat(fork, staged=False, all_files=all_files))
-        print(f"\nTop churn files ({fork}..HEAD, add+del; upstream {base}):")
-        print_top_churn(entries, "  Non-test", args.top_files, is_test=False)
-        print_top_churn(entries, "  Test", args.top_files, is_test=True)
+    # One unfiltered diff per comparison; views filter in memory instead of re-running git.
+    diffs = {
+        "branch": git_diff_entries(f"{fork}..HEAD"),
+        "staged": git_diff_entries("--staged"),
+        "working": git_diff_entries(),
+    }
+    untracked = count_untracked()
+
+    if args.both_views:
+        print_view(diffs, untracked, fork=fork, base=base, all_files=False, deep=False, top_files=args.top_files)
+        print(DEEP_VIEW_MARKER)
+        print_view(diffs, untracked, fork=fork, base=base, all_files=True, deep=True, top_files=args.top_files)
+        return
+    print_view(
+        diffs,
+        untracked,
+        fork=fork,
+        base=base,
+        all_files=args.all_files,
+        deep=args.deep,
+        top_files=args.top_files,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,277 @@
+"""Token-window duplicate detector for code-health.
+
+Replaces the jscpd subprocess: files are tokenized (comments and blank lines
+dropped, like jscpd's weak mode), fingerprinted with a rolling hash over
+`min_tokens`-token windows, and matching windows (confirmed token by token)
+are merged into clones.
+Fingerprints are cached per file keyed by git blob SHA.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import subprocess
+import tokenize
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+CACHE_VERSION = 2
+SOURCE_SUFFIXES = set(
+    ".py .js .jsx .mjs .cjs .ts .tsx .vue .go .rs .java .kt .scala "
+    ".c .h .cc .cpp .hpp .cs .rb .php .swift .sh .sql .css .scss".split()
+)
+GENERIC_TOKEN_PATTERN = re.compile(
+    r"(?P<comment>//[^\n]*|/\*.*?\*/|#[^\n]*)"
+    r"|(?P<token>\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`|\w+|[^\s\w])",
+    re.DOTALL,
+)
+PYTHON_SKIP_TOKENS = {
+    tokenize.COMMENT,
+    tokenize.NL,
+    tokenize.NEWLINE,
+    tokenize.INDENT,
+    tokenize.DEDENT,
+    tokenize.ENCODING,
+    tokenize.ENDMARKER,
+}
+HASH_MOD = (1 << 61) - 1
+HASH_BASE = 1_000_003
+# Below this many files the process pool costs more than it saves.
+POOL_MIN_FILES = 16
+
+
+def list_source_files(ignore: list[str]) -> list[str]:
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    files = []
+    for path in sorted(set(result.stdout.split("\0"))):
+        if not path or Path(path).suffix not in SOURCE_SUFFIXES:
+            continue
+        if any(fnmatch(f"./{path}", pattern) for pattern in ignore):
+            continue
+        if Path(path).is_file():
+            files.append(path)
+    return files
+
+
+def tokenize_source(path: str, text: str) -> list[tuple[str, int]]:
+    if path.endswith(".py"):
+        try:
+            return [
+                (token.string, token.start[0])
+                for token in tokenize.generate_tokens(io.StringIO(text).readline)
+                if token.type not in PYTHON_SKIP_TOKENS
+            ]
+        except (tokenize.TokenError, SyntaxError):
+            pass
+    tokens: list[tuple[str, int]] = []
+    line = 1
+    position = 0
+    for match in GENERIC_TOKEN_PATTERN.finditer(text):
+        line += text.count("\n", position, match.start())
+        position = match.start()
+        if match.group("token") is not None:
+            tokens.append((match.group("token"), line))
+    return tokens
+
+
+def fingerprint_file(path: str, min_tokens: int) -> dict[str, Any]:
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return {"lines": 0, "tokens": 0, "hashes": [], "values": [], "token_lines": []}
+    text = data.decode("utf-8", errors="replace")
+    tokens = tokenize_source(path, text)
+    values = [zlib.crc32(token.encode()) for token, _ in tokens]
+    hashes: list[int] = []
+    if len(values) >= min_tokens:
+        top = pow(HASH_BASE, min_tokens - 1, HASH_MOD)
+        window = 0
+        for value in values[:min_tokens]:
+            window = (window * HASH_BASE + value) % HASH_MOD
+        hashes.append(window)
+        for index in range(min_tokens, len(values)):
+            window = ((window - values[index - min_tokens] * top) * HASH_BASE + values[index]) % HASH_MOD
+            hashes.append(window)
+    return {
+        "lines": text.count("\n") + (0 if not text or text.endswith("\n") else 1),
+        "tokens": len(tokens),
+        "hashes": hashes,
+        "values": values,
+        "token_lines": [line for _, line in tokens],
+    }
+
+
+def git_blob_sha(path: str) -> str | None:
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def load_cache(path: Path | None, min_tokens: int) -> dict[str, dict[str, Any]]:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION or data.get("min_tokens") != min_tokens:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_cache(path: Path, min_tokens: int, files: dict[str, dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps({"version": CACHE_VERSION, "min_tokens": min_tokens, "files": files}))
+    temp_path.replace(path)
+
+
+def fingerprint_files(
+    paths: list[str], min_tokens: int, cache: dict[str, dict[str, Any]]
+) -> tuple[dict[str, dict[str, Any]], int]:
+    shas = {path: git_blob_sha(path) for path in paths}
+    prints = {path: cache[path] for path in paths if shas[path] and cache.get(path, {}).get("sha") == shas[path]}
+    misses = [path for path in paths if path not in prints]
+    if len(misses) < POOL_MIN_FILES:
+        fresh = [fingerprint_file(path, min_tokens) for path in misses]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(misses), os.cpu_count() or 1)) as pool:
+            fresh = list(pool.map(fingerprint_file, misses, [min_tokens] * len(misses), chunksize=8))
+    for path, entry in zip(misses, fresh):
+        prints[path] = {**entry, "sha": shas[path]}
+    return {path: prints[path] for path in paths}, len(paths) - len(misses)
+
+
+Run = tuple[str, int, int, int]  # (source path, source window, first window, last window)
+
+
+def clone_record(
+    prints: dict[str, dict[str, Any]], path: str, run: Run, min_tokens: int, min_lines: int
+) -> dict[str, Any] | None:
+    source, source_start, start, end = run
+    token_lines = prints[path]["token_lines"]
+    source_lines = prints[source]["token_lines"]
+    first = token_lines[start]
+    last = token_lines[end + min_tokens - 1]
+    if last - first + 1 < min_lines:
+        return None
+    return {
+        "format": Path(path).suffix.lstrip("."),
+        "lines": last - first + 1,
+        "tokens": end - start + min_tokens,
+        "firstFile": {
+            "name": source,
+            "start": source_lines[source_start],
+            "end": source_lines[source_start + end - start + min_tokens - 1],
+        },
+        "secondFile": {"name": path, "start": first, "end": last},
+    }
+
+
+def find_clones(prints: dict[str, dict[str, Any]], min_tokens: int, min_lines: int) -> list[dict[str, Any]]:
+    # First occurrence of each window hash wins; later matching windows are its duplicates,
+    # and consecutive matching windows merge into one clone. Hash matches are confirmed
+    # against the token values, so a hash collision never reports a clone.
+    seen: dict[int, tuple[str, int]] = {}
+    runs: list[tuple[str, Run]] = []
+    for path, entry in prints.items():
+        values = entry["values"]
+        run: Run | None = None
+        for index, value in enumerate(entry["hashes"]):
+            match = seen.get(value)
+            if match is not None and match[0] == path and match[1] + min_tokens > index:
+                match = None  # overlapping window in the same file
+            extends = (
+                match is not None and run is not None and run[0] == match[0] and match[1] == run[1] + index - run[2]
+            )
+            if match is not None:
+                source_values = prints[match[0]]["values"]
+                if extends:
+                    # The previous window already matched; only the incoming token is new.
+                    last = min_tokens - 1
+                    confirmed = source_values[match[1] + last] == values[index + last]
+                else:
+                    confirmed = source_values[match[1] : match[1] + min_tokens] == values[index : index + min_tokens]
+                if not confirmed:
+                    match = None
+                    extends = False
+            if extends:
+                run = (run[0], run[1], run[2], index)
+            else:
+                if run is not None:
+                    runs.append((path, run))
+                run = (match[0], match[1], index, index) if match is not None else None
+            seen.setdefault(value, (path, index))
+        if run is not None:
+            runs.append((path, run))
+    clones = [clone_record(prints, path, run, min_tokens, min_lines) for path, run in runs]
+    return [clone for clone in clones if clone is not None]
+
+
+def build_report(prints: dict[str, dict[str, Any]], clones: list[dict[str, Any]]) -> dict[str, Any]:
+    # Duplicated lines count each file's lines covered by a later copy once.
+    covered: dict[str, set[int]] = {}
+    for clone in clones:
+        second = clone["secondFile"]
+        covered.setdefault(second["name"], set()).update(range(second["start"], second["end"] + 1))
+    total_lines = sum(entry["lines"] for entry in prints.values())
+    duplicated_lines = sum(len(lines) for lines in covered.values())
+    return {
+        "statistics": {
+            "total": {
+                "sources": len(prints),
+                "lines": total_lines,
+                "tokens": sum(entry["tokens"] for entry in prints.values()),
+                "clones": len(clones),
+                "duplicatedLines": duplicated_lines,
+                "percentage": round(duplicated_lines / total_lines * 100, 2) if total_lines else 0,
+            }
+        },
+        "duplicates": clones,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Native token-window duplicate detector")
+    parser.add_argument("--output", type=Path, required=True, help="jscpd-compatible JSON report path")
+    parser.add_argument("--min-lines", type=int, default=5)
+    parser.add_argument("--min-tokens", type=int, default=70)
+    parser.add_argument("--ignore", default="", help="Comma-separated glob patterns to skip")
+    parser.add_argument("--cache-json", type=Path, default=None, help="Per-file fingerprint cache keyed by blob SHA")
+    args = parser.parse_args()
+
+    ignore = [pattern for pattern in args.ignore.split(",") if pattern]
+    paths = list_source_files(ignore)
+    prints, hits = fingerprint_files(paths, args.min_tokens, load_cache(args.cache_json, args.min_tokens))
+    if args.cache_json is not None:
+        save_cache(args.cache_json, args.min_tokens, prints)
+    report = build_report(prints, find_clones(prints, args.min_tokens, args.min_lines))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    total = report["statistics"]["total"]
+    print(
+        f"Duplication: {total['clones']} clones, {total['duplicatedLines']} duplicated lines "
+        f"({total['percentage']}%) across {total['sources']} files; "
+        f"fingerprints {hits} cached, {len(paths) - hits} computed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from coverage_hotspots import iter_coverage_files
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS health_runs (
+        project TEXT NOT NULL,
+        branch TEXT NOT NULL,
+        commit_sha TEXT NOT NULL,
+        recorded_at TEXT NOT NULL,
+        dirty INTEGER NOT NULL,
+        mode TEXT NOT NULL,
+        status TEXT NOT NULL,
+        xenon_status TEXT NOT NULL,
+        duplication_pct REAL NOT NULL,
+        duplicated_lines INTEGER NOT NULL,
+        clones INTEGER NOT NULL,
+        coverage_pct REAL,
+        PRIMARY KEY (project, branch, commit_sha, dirty)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS function_complexity (
+        project TEXT NOT NULL,
+        branch TEXT NOT NULL,
+        commit_sha TEXT NOT NULL,
+        dirty INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        name TEXT NOT NULL,
+        lineno INTEGER NOT NULL,
+        rank TEXT NOT NULL,
+        complexity INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS file_coverage (
+        project TEXT NOT NULL,
+        branch TEXT NOT NULL,
+        commit_sha TEXT NOT NULL,
+        dirty INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        statements INTEGER NOT NULL,
+        missing INTEGER NOT NULL,
+        percent REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS health_runs_by_commit ON health_runs (project, commit_sha, recorded_at)",
+    "CREATE INDEX IF NOT EXISTS function_complexity_by_run "
+    "ON function_complexity (project, commit_sha, branch, path, name)",
+    "CREATE INDEX IF NOT EXISTS file_coverage_by_run ON file_coverage (project, commit_sha, branch, path)",
+)
+RUN_TABLES = ("health_runs", "function_complexity", "file_coverage")
+INDEXES = ("health_runs_by_commit", "function_complexity_by_run", "file_coverage_by_run")
+# Version 2 keys runs on the dirty flag too, so a dirty-worktree run no longer replaces the clean snapshot.
+SCHEMA_VERSION = 2
+# Coverage drops smaller than this (percentage points) are treated as noise.
+COVERAGE_DROP_TOLERANCE = 0.5
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    with connection:
+        if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            migrate_v1(connection)
+        for statement in SCHEMA:
+            connection.execute(statement)
+    return connection
+
+
+def migrate_v1(connection: sqlite3.Connection) -> None:
+    """Re-key version 1 tables (no dirty column on the per-function/per-file rows) in place."""
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "health_runs" in tables:
+        for index in INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {index}")
+        for table in RUN_TABLES:
+            connection.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute("INSERT INTO health_runs SELECT * FROM health_runs_v1")
+        for table in RUN_TABLES[1:]:
+            columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table}_v1)")]
+            detail = ", ".join(f"t.{column}" for column in columns[3:])
+            connection.execute(
+                f"INSERT INTO {table} SELECT t.project, t.branch, t.commit_sha, r.dirty, {detail} "
+                f"FROM {table}_v1 t JOIN health_runs_v1 r "
+                "USING (project, branch, commit_sha)"
+            )
+        for table in RUN_TABLES:
+            connection.execute(f"DROP TABLE {table}_v1")
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def load_function_rows(metrics_json: Path | None) -> list[tuple[str, str, int, str, int]]:
+    if metrics_json is None:
+        return []
+    try:
+        metrics = json.loads(metrics_json.read_text())
+    except (OSError, json.JSONDecodeError):
+        return []
+    return [
+        (item["path"], item["name"], item["lineno"], item["rank"], item["complexity"])
+        for item in metrics.get("functions", [])
+    ]
+
+
+def load_coverage_rows(coverage_json: Path | None) -> tuple[list[tuple[str, int, int, float]], float | None]:
+    if coverage_json is None or not coverage_json.exists():
+        return [], None
+    rows = []
+    statements = missing = 0
+    for path, info in iter_coverage_files(coverage_json):
+        summary = info.get("summary", {})
+        file_statements = int(summary.get("num_statements", 0))
+        file_missing = int(summary.get("missing_lines", 0))
+        rows.append((path, file_statements, file_missing, float(summary.get("percent_covered", 0.0))))
+        statements += file_statements
+        missing += file_missing
+    total = (statements - missing) / statements * 100 if statements else None
+    return rows, total
+
+
+def record_run(
+    db_path: Path,
+    *,
+    project: str,
+    branch: str,
+    commit_sha: str,
+    dirty: bool,
+    report: dict[str, Any],
+    metrics_json: Path | None,
+    coverage_json: Path | None,
+) -> None:
+    function_rows = load_function_rows(metrics_json)
+    coverage_rows, coverage_pct = load_coverage_rows(coverage_json)
+    duplication = report.get("duplication") or {}
+    key = (project, branch, commit_sha, int(dirty))
+    connection = connect(db_path)
+    try:
+        with connection:
+            # Re-running on the same commit replaces that commit's snapshot; clean and dirty runs are kept apart.
+            for table in RUN_TABLES:
+                connection.execute(
+                    f"DELETE FROM {table} WHERE project = ? AND branch = ? AND commit_sha = ? AND dirty = ?",
+                    key,
+                )
+            connection.execute(
+                "INSERT INTO health_runs (project, branch, commit_sha, dirty, recorded_at, mode, status, "
+                "xenon_status, duplication_pct, duplicated_lines, clones, coverage_pct) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    *key,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    report.get("mode", ""),
+                    report.get("status", ""),
+                    report.get("xenon_status", "UNKNOWN"),
+                    float(duplication.get("pct") or 0),
+                    int(duplication.get("dup_lines") or 0),
+                    int(duplication.get("clones") or 0),
+                    coverage_pct,
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO function_complexity "
+                "(project, branch, commit_sha, dirty, path, name, lineno, rank, complexity) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, *row) for row in function_rows],
+            )
+            connection.executemany(
+                "INSERT INTO file_coverage (project, branch, commit_sha, dirty, path, statements, missing, percent) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, *row) for row in coverage_rows],
+            )
+    finally:
+        connection.close()
+
+
+def latest_run(
+    connection: sqlite3.Connection, project: str, commit_sha: str, *, dirty: bool, branch: str | None = None
+) -> dict[str, Any] | None:
+    cursor = connection.execute(
+        "SELECT * FROM health_runs WHERE project = ? AND commit_sha = ? AND dirty = ? AND branch = COALESCE(?, branch) "
+        "ORDER BY recorded_at DESC LIMIT 1",
+        (project, commit_sha, int(dirty), branch),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+def compare_runs(
+    db_path: Path,
+    *,
+    project: str,
+    head: tuple[str, str, bool],
+    base_commit: str,
+    limit: int = 20,
+) -> dict[str, Any]:
+    """Compare the recorded head run (branch, commit, dirty) with the newest clean recorded run of base_commit."""
+    head_branch, head_commit, head_dirty = head
+    connection = connect(db_path)
+    try:
+        head_run = latest_run(connection, project, head_commit, dirty=head_dirty, branch=head_branch)
+        base_run = latest_run(connection, project, base_commit, dirty=False)
+        if head_run is None or base_run is None:
+            return {"base_commit": base_commit, "base_found": base_run is not None, "regressions": []}
+        params = {
+            "project": project,
+            "head_branch": head_branch,
+            "head_commit": head_commit,
+            "head_dirty": int(head_dirty),
+            "base_branch": base_run["branch"],
+            "base_commit": base_commit,
+            "tolerance": COVERAGE_DROP_TOLERANCE,
+            "limit": limit,
+        }
+        complexity = connection.execute(
+            """
+            SELECT h.path, h.name, h.complexity, h.rank, b.complexity, b.rank
+            FROM function_complexity h
+            LEFT JOIN function_complexity b
+              ON b.project = h.project AND b.commit_sha = :base_commit AND b.branch = :base_branch
+             AND b.dirty = 0 AND b.path = h.path AND b.name = h.name
+            WHERE h.project = :project AND h.commit_sha = :head_commit AND h.branch = :head_branch
+              AND h.dirty = :head_dirty
+              AND ((b.complexity IS NULL AND h.rank > 'B') OR h.complexity > b.complexity)
+            ORDER BY h.complexity - COALESCE(b.complexity, 0) DESC, h.path, h.name
+            LIMIT :limit
+            """,
+            params,
+        ).fetchall()
+        coverage = connection.execute(
+            """
+            SELECT h.path, h.percent, b.percent
+            FROM file_coverage h
+            JOIN file_coverage b
+              ON b.project = h.project AND b.commit_sha = :base_commit AND b.branch = :base_branch
+             AND b.dirty = 0 AND b.path = h.path
+            WHERE h.project = :project AND h.commit_sha = :head_commit AND h.branch = :head_branch
+              AND h.dirty = :head_dirty
+              AND b.percent - h.percent > :tolerance
+            ORDER BY b.percent - h.percent DESC, h.path
+            LIMIT :limit
+            """,
+            params,
+        ).fetchall()
+    finally:
+        connection.close()
+
+    regressions: list[str] = []
+    if head_run["xenon_status"] == "FAIL" and base_run["xenon_status"] == "PASS":
+        regressions.append("xenon thresholds: PASS -> FAIL")
+    if head_run["duplication_pct"] > base_run["duplication_pct"]:
+        regressions.append(
+            f"duplication: {base_run['duplication_pct']}% -> {head_run['duplication_pct']}% "
+            f"({base_run['clones']} -> {head_run['clones']} clones)"
+        )
+    if (
+        head_run["coverage_pct"] is not None
+        and base_run["coverage_pct"] is not None
+        and base_run["coverage_pct"] - head_run["coverage_pct"] > COVERAGE_DROP_TOLERANCE
+    ):
+        regressions.append(f"total coverage: {base_run['coverage_pct']:.2f}% -> {head_run['coverage_pct']:.2f}%")
+    for path, name, cc, rank, base_cc, base_rank in complexity:
+        if base_cc is None:
+            regressions.append(f"new complex block: {path}:{name} {rank} ({cc})")
+        else:
+            regressions.append(f"complexity: {path}:{name} {base_rank} ({base_cc}) -> {rank} ({cc})")
+    for path, percent, base_percent in coverage:
+        regressions.append(f"coverage: {path} {base_percent:.2f}% -> {percent:.2f}%")
+    return {
+        "base_commit": base_commit,
+        "base_found": True,
+        "base_branch": base_run["branch"],
+        "base_recorded_at": base_run["recorded_at"],
+        "regressions": regressions,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the code-health trend store.")
+    parser.add_argument("--db", type=Path, required=True, help="SQLite trend store written by run_code_health.py")
+    parser.add_argument("--project", required=True)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compare = subparsers.add_parser("compare", help="Flag regressions of one recorded commit against another.")
+    compare.add_argument("--branch", required=True)
+    compare.add_argument("--head", required=True, help="Recorded head commit SHA")
+    compare.add_argument("--dirty", action="store_true", help="Use the head's dirty-worktree run")
+    compare.add_argument("--base", required=True, help="Recorded base commit SHA")
+    compare.add_argument("--limit", type=int, default=20)
+
+    history = subparsers.add_parser("history", help="Recorded runs for one branch, newest first.")
+    history.add_argument("--branch", required=True)
+    history.add_argument("--limit", type=int, default=20)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "compare":
+        output: Any = compare_runs(
+            args.db,
+            project=args.project,
+            head=(args.branch, args.head, args.dirty),
+            base_commit=args.base,
+            limit=args.limit,
+        )
+    else:
+        connection = connect(args.db)
+        try:
+            cursor = connection.execute(
+                "SELECT commit_sha, recorded_at, dirty, status, xenon_status, duplication_pct, coverage_pct "
+                "FROM health_runs WHERE project = ? AND branch = ? ORDER BY recorded_at DESC LIMIT ?",
+                (args.project, args.branch, args.limit),
+            )
+            columns = [column[0] for column in cursor.description]
+            output = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            connection.close()
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
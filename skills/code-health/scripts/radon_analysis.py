@@ -0,0 +1,85 @@
+"""Single-parse radon analysis for code_health_compact.
+
+Runs inside the project environment, parses each file's AST once, and emits
+radon-compatible cc/mi lines plus raw cc scores as JSON.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from radon.complexity import SCORE, cc_rank, sorted_results
+from radon.metrics import h_visit_ast, mi_compute, mi_rank
+from radon.raw import analyze
+from radon.visitors import ComplexityVisitor
+
+SKIP_DIRS = {"venv", "node_modules", "dist", "build", "__pycache__"}
+# Below this many files the process pool costs more than it saves.
+POOL_MIN_FILES = 8
+
+
+def analyze_file(path: str) -> dict[str, Any]:
+    try:
+        code = Path(path).read_text(encoding="utf-8", errors="replace")
+        tree = ast.parse(code)
+        visitor = ComplexityVisitor.from_ast(tree)
+        raw = analyze(code)
+        volume = h_visit_ast(tree).total.volume
+    except Exception as exc:  # noqa: BLE001 - mirror radon's per-file "ERROR:" lines
+        return {"cc_lines": [f"    ERROR: {exc}"], "mi_lines": [], "scores": []}
+
+    blocks = sorted_results(visitor.blocks, order=SCORE)
+    cc_lines = [
+        f"    {block.letter} {block.lineno}:{block.col_offset} {block.fullname} - "
+        f"{cc_rank(block.complexity)} ({block.complexity})"
+        for block in blocks
+    ]
+    # radon mi counts multi-line strings as comments by default.
+    comment_lines = raw.comments + raw.multi
+    comments = comment_lines / float(raw.sloc) * 100 if raw.sloc != 0 else 0
+    mi = mi_compute(volume, visitor.total_complexity, raw.lloc, comments)
+    return {
+        "cc_lines": cc_lines,
+        "mi_lines": [f"{path} - {mi_rank(mi)} ({mi:.2f})"],
+        "scores": [block.complexity for block in blocks],
+    }
+
+
+def expand_paths(paths: list[str]) -> list[str]:
+    expanded: list[str] = []
+    for path in paths:
+        root = Path(path)
+        if not root.is_dir():
+            expanded.append(path)
+            continue
+        for candidate in sorted(root.rglob("*.py")):
+            parts = candidate.relative_to(root).parts[:-1]
+            if not any(part.startswith(".") or part in SKIP_DIRS for part in parts):
+                expanded.append(str(candidate))
+    return expanded
+
+
+def analyze_files(paths: list[str]) -> dict[str, dict[str, Any]]:
+    paths = expand_paths(paths)
+    if len(paths) < POOL_MIN_FILES:
+        return {path: analyze_file(path) for path in paths}
+    workers = min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(analyze_file, paths, chunksize=max(1, len(paths) // (workers * 4)))
+        return dict(zip(paths, results))
+
+
+def main() -> None:
+    # Paths arrive one per line on stdin so large target sets never hit argv limits.
+    paths = [line.strip() for line in sys.stdin if line.strip()]
+    json.dump(analyze_files(paths), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
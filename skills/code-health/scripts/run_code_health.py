@@ -7,6 +7,9 @@ import re
 import shutil
 import subprocess
 import sys
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -16,7 +19,10 @@ COMMON_DIR = Path(__file__).resolve().parents[2] / "_common"
 if str(COMMON_DIR) not in sys.path:
     sys.path.insert(0, str(COMMON_DIR))
 
-from progress_runtime import StatusTracker, default_status_path, run_command_capture
+from diff_summary_compact import DEEP_VIEW_MARKER
+from health_trends import compare_runs, record_run
+from progress_runtime import GraphStep, StatusTracker, default_status_path, run_command_capture, run_step_graph
+from worktree_state import worktree_fingerprint
 
 IGNORE = (
     "**/node_modules/**,**/.git/**,**/.venv/**,**/venv/**,**/dist/**,**/build/**,"
@@ -27,6 +33,14 @@ IGNORE = (
 
 
 _OUTPUT_EXCERPT_LIMIT = 2000
+# Large tool logs (pytest, jscpd) keep only head/tail bytes in memory; the full
+# stream is spilled under <out-dir>/logs.
+_CAPTURE_LIMIT_BYTES = 1024 * 1024
+# --watch refreshes only these steps; polling re-lists files every N polls and
+# waits for saves to settle before refreshing.
+WATCH_STEPS = ("diff_summary", "duplication", "code_health_compact")
+WATCH_RELIST_POLLS = 10
+WATCH_DEBOUNCE_SEC = 0.15
 
 
 @dataclass(frozen=True)
@@ -52,14 +66,20 @@ def run(
     check: bool = True,
     tracker: StatusTracker | None = None,
     relay_stdout_to_stderr: bool = True,
+    capture_limit_bytes: int | None = None,
+    spill_dir: Path | None = None,
+    env: dict[str, str] | None = None,
 ) -> str:
     result = run_command_capture(
         command=cmd,
         cwd=get_repo_root(),
+        env=env,
         step_name=step,
         tracker=tracker,
         relay_stdout_to_stderr=relay_stdout_to_stderr,
         relay_stderr=True,
+        capture_limit_bytes=capture_limit_bytes,
+        spill_dir=spill_dir,
     )
     if check and result.returncode != 0:
         raise StepFailure(
@@ -80,6 +100,9 @@ def run_module(
     check: bool = True,
     tracker: StatusTracker | None = None,
     relay_stdout_to_stderr: bool = True,
+    capture_limit_bytes: int | None = None,
+    spill_dir: Path | None = None,
+    env: dict[str, str] | None = None,
 ) -> str:
     if shutil.which("uv"):
         cmd = ["uv", "run", module, *args]
@@ -91,6 +114,9 @@ def run_module(
         check=check,
         tracker=tracker,
         relay_stdout_to_stderr=relay_stdout_to_stderr,
+        capture_limit_bytes=capture_limit_bytes,
+        spill_dir=spill_dir,
+        env=env,
     )
 
 
@@ -112,6 +138,68 @@ def run_python_script(
     )
 
 
+def shard_test_files(collect_out: str, shards: int) -> list[list[str]]:
+    # Group collected node ids by file and balance shards by test count, largest files first.
+    counts: dict[str, int] = {}
+    for line in collect_out.splitlines():
+        if "::" in line:
+            path = line.split("::", 1)[0].strip()
+            counts[path] = counts.get(path, 0) + 1
+    buckets: list[tuple[int, list[str]]] = [(0, []) for _ in range(max(1, min(shards, len(counts))))]
+    for path, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        index = min(range(len(buckets)), key=lambda i: buckets[i][0])
+        total, files = buckets[index]
+        buckets[index] = (total + count, [*files, path])
+    return [sorted(files) for _, files in buckets if files]
+
+
+def run_sharded_coverage_pytest(
+    shards: int,
+    data_dir: Path,
+    *,
+    tracker: StatusTracker,
+    log_dir: Path,
+) -> str:
+    collect_out = run_module(
+        "coverage_collect", "pytest", ["--collect-only", "-q"], tracker=tracker, relay_stdout_to_stderr=False
+    )
+    shard_files = shard_test_files(collect_out, shards) or [[]]
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for stale in data_dir.glob(".coverage*"):
+        stale.unlink()
+    for index in range(1, len(shard_files) + 1):
+        step = f"coverage_pytest_shard_{index}"
+        tracker.set_artifact(f"{step}_log", str(log_dir / f"{step}.stdout.log"))
+
+    def run_shard(index: int, files: list[str]) -> str:
+        step = f"coverage_pytest_shard_{index}"
+        return run_module(
+            step,
+            "pytest",
+            ["--cov=stowage", "--cov=tui", "--cov-report=", "-q", *files],
+            tracker=tracker,
+            capture_limit_bytes=_CAPTURE_LIMIT_BYTES,
+            spill_dir=log_dir,
+            env={**os.environ, "COVERAGE_FILE": str(data_dir / f".coverage.shard{index}")},
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, len(shard_files))) as pool:
+        futures = [pool.submit(run_shard, index, files) for index, files in enumerate(shard_files, start=1)]
+    # Surface the first failing shard in shard order, like a serial run would.
+    outputs = [future.result() for future in futures]
+    run_module(
+        "coverage_combine",
+        "coverage",
+        ["combine", str(data_dir)],
+        tracker=tracker,
+        env={**os.environ, "COVERAGE_FILE": str(data_dir / ".coverage")},
+    )
+    return "\n".join(
+        f"[shard {index}/{len(outputs)}: {len(files)} test files]\n{output}"
+        for index, (files, output) in enumerate(zip(shard_files, outputs), start=1)
+    )
+
+
 def jscpd_command() -> list[str] | None:
     if shutil.which("npx"):
         return ["npx", "--yes", "jscpd"]
@@ -202,6 +290,16 @@ def rotate_legacy(path: Path, timestamp: str) -> None:
     path.rename(path.with_name(legacy_name))
 
 
+def write_artifact(path: Path, text: str, *, rotate: bool) -> None:
+    # Watch refreshes pass rotate=False: the report is replaced in place instead of piling up legacy copies.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if rotate:
+        rotate_legacy(path, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(text)
+    os.replace(temp_path, path)
+
+
 def parse_jscpd_json(path: Path) -> dict[str, Any]:
     try:
         data = json.loads(path.read_text())
@@ -221,6 +319,43 @@ def parse_xenon_status(text: str) -> str:
     return match.group(1) if match else "UNKNOWN"
 
 
+def parse_analysis_cache(text: str) -> dict[str, int] | None:
+    match = re.search(r"Static analysis: (\d+) hits, (\d+) misses", text)
+    if match is None:
+        return None
+    return {"hits": int(match.group(1)), "misses": int(match.group(2))}
+
+
+def load_analyzer_timings(metrics_json: Path) -> dict[str, float]:
+    try:
+        metrics = json.loads(metrics_json.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    timings = metrics.get("analyzer_timings") if isinstance(metrics, dict) else None
+    return timings if isinstance(timings, dict) else {}
+
+
+def format_timing_rows(timings: dict[str, Any]) -> list[str]:
+    def cell(row: dict[str, Any], key: str) -> str:
+        value = row.get(key)
+        return "-" if value is None else str(value)
+
+    lines = [
+        "| Step | Status | Wall (s) | CPU user (s) | CPU sys (s) | Peak RSS (MB) |",
+        "| --- | --- | ---: | ---: | ---: | ---: |",
+    ]
+    for row in sorted(timings["steps"], key=lambda item: item.get("wall_sec", 0), reverse=True):
+        lines.append(
+            f"| {row['name']} | {row.get('status') or '-'} | {cell(row, 'wall_sec')} | "
+            f"{cell(row, 'cpu_user_sec')} | {cell(row, 'cpu_sys_sec')} | {cell(row, 'max_rss_mb')} |"
+        )
+        if row["name"] == "code_health_compact":
+            # The analyzers run concurrently inside the step, so their walls overlap.
+            for name, wall in sorted(timings["analyzers"].items(), key=lambda item: item[1], reverse=True):
+                lines.append(f"| &nbsp;&nbsp;{name} | - | {wall} | - | - | - |")
+    return lines
+
+
 def build_failure_metadata(
     failure: StepFailure,
     *,
@@ -261,6 +396,9 @@ def write_report(
     status: str,
     standard_test_status: str,
     failure: dict[str, Any] | None,
+    trend: dict[str, Any] | None = None,
+    timings: dict[str, Any] | None = None,
+    rotate: bool = True,
 ) -> None:
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     xenon_status = parse_xenon_status(code_out)
@@ -308,6 +446,19 @@ def write_report(
         lines.append("```text")
         lines.append(coverage_out or "(no coverage output)")
         lines.append("```")
+    if trend is not None and trend.get("compare_to"):
+        lines.append("")
+        lines.append(f"## Trend vs {trend['compare_to']} ({trend['base_commit'][:12]})")
+        if not trend["base_found"]:
+            lines.append("(no recorded code-health run for that commit; run code-health there once to enable comparison)")
+        elif trend["regressions"]:
+            lines.extend(f"- REGRESSION {item}" for item in trend["regressions"])
+        else:
+            lines.append("- No regressions against the recorded base run.")
+    if timings is not None and timings["steps"]:
+        lines.append("")
+        lines.append("## Step Timings")
+        lines.extend(format_timing_rows(timings))
     if failure is not None:
         lines.append("")
         lines.append("## Failure Evidence")
@@ -325,17 +476,97 @@ def write_report(
         lines.append("```")
     lines.append("")
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    timestamp_fs = datetime.now().strftime("%Y%m%d_%H%M%S")
-    rotate_legacy(output_path, timestamp_fs)
-    output_path.write_text("\n".join(lines))
+    write_artifact(output_path, "\n".join(lines), rotate=rotate)
 
 
-def write_json(output_path: Path, data: dict[str, Any]) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    timestamp_fs = datetime.now().strftime("%Y%m%d_%H%M%S")
-    rotate_legacy(output_path, timestamp_fs)
-    output_path.write_text(json.dumps(data, indent=2))
+def list_watched_files(repo_root: Path, exclude: Path) -> list[Path]:
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+        cwd=repo_root,
+        capture_output=True,
+        text=True,
+    )
+    excluded = exclude.resolve()
+    files = []
+    for name in result.stdout.split("\0"):
+        if not name:
+            continue
+        path = repo_root / name
+        if not path.resolve().is_relative_to(excluded):
+            files.append(path)
+    return files
+
+
+def snapshot_mtimes(files: list[Path]) -> dict[Path, int]:
+    mtimes: dict[Path, int] = {}
+    for path in files:
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
+
+
+def watch_changes(repo_root: Path, *, exclude: Path, interval: float) -> Iterator[list[str]]:
+    # Polling keeps this dependency-free; the file list is re-read periodically to catch new files.
+    files = list_watched_files(repo_root, exclude)
+    previous = snapshot_mtimes(files)
+    polls = 0
+    while True:
+        time.sleep(interval)
+        polls += 1
+        if polls % WATCH_RELIST_POLLS == 0:
+            files = list_watched_files(repo_root, exclude)
+        current = snapshot_mtimes(files)
+        if current == previous:
+            continue
+        # Let a burst of saves settle before refreshing.
+        while True:
+            time.sleep(WATCH_DEBOUNCE_SEC)
+            settled = snapshot_mtimes(files)
+            if settled == current:
+                break
+            current = settled
+        changed = sorted(
+            str(path.relative_to(repo_root))
+            for path in current.keys() | previous.keys()
+            if current.get(path) != previous.get(path)
+        )
+        previous = current
+        yield changed
+
+
+def record_and_compare_trends(
+    db_path: Path,
+    *,
+    project: str,
+    branch: str,
+    report: dict[str, Any],
+    metrics_json: Path,
+    coverage_json: Path | None,
+    compare_to: str | None,
+) -> dict[str, Any]:
+    commit_sha = git_output("rev-parse", "HEAD") or "unknown"
+    dirty = bool(git_output("status", "--porcelain", "--untracked-files=no"))
+    record_run(
+        db_path,
+        project=project,
+        branch=branch,
+        commit_sha=commit_sha,
+        dirty=dirty,
+        report=report,
+        metrics_json=metrics_json,
+        coverage_json=coverage_json,
+    )
+    trend: dict[str, Any] = {"db": str(db_path), "commit": commit_sha, "dirty": dirty, "compare_to": compare_to}
+    if compare_to:
+        base_commit = git_output("rev-parse", "--verify", f"{compare_to}^{{commit}}") or compare_to
+        trend.update(compare_runs(db_path, project=project, head=(branch, commit_sha, dirty), base_commit=base_commit))
+    return trend
+
+
+def write_json(output_path: Path, data: dict[str, Any], *, rotate: bool = True) -> None:
+    write_artifact(output_path, json.dumps(data, indent=2), rotate=rotate)
 
 
 def main() -> None:
@@ -352,6 +583,46 @@ def main() -> None:
     parser.add_argument("--skip-coverage", action="store_true")
     parser.add_argument("--out-dir", type=Path, default=None)
     parser.add_argument("--status-json", type=Path, default=None)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Maximum number of independent steps run concurrently (1 keeps the old serial order)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the first run, keep polling for file changes and refresh the static sections of the report",
+    )
+    parser.add_argument("--watch-interval", type=float, default=0.3, help="Polling interval in seconds for --watch")
+    parser.add_argument(
+        "--trend-db",
+        type=Path,
+        default=None,
+        help="SQLite trend store for per-commit snapshots (default: <out-dir>/code_health_trends.sqlite3)",
+    )
+    parser.add_argument(
+        "--compare-to",
+        default=None,
+        help="Flag regressions against the recorded snapshot of this ref's commit (no re-analysis)",
+    )
+    parser.add_argument(
+        "--duplication-engine",
+        choices=["native", "jscpd"],
+        default="native",
+        help="Duplicate detector: built-in token-window scanner (default) or the jscpd CLI via npx",
+    )
+    parser.add_argument(
+        "--coverage-shards",
+        type=int,
+        default=1,
+        help="Split the coverage pytest run across N parallel shards and combine their data (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Re-analyze only files changed since the fork point; reuse cached static-analysis results for the rest",
+    )
     args = parser.parse_args()
 
     skill_dir = Path(__file__).resolve().parent
@@ -379,6 +650,8 @@ def main() -> None:
             "mode": args.mode,
             "top": args.top,
             "top_files": args.top_files,
+            "changed_only": args.changed_only,
+            "coverage_shards": args.coverage_shards,
         },
     )
     tracker.set_artifact("output_markdown", str(output_path))
@@ -389,11 +662,6 @@ def main() -> None:
         message=f"code-health start: upstream={base_ref}, fork_point={fork}, mode={args.mode}, skip_coverage={args.skip_coverage}",
         output_dir=str(out_dir),
     )
-    diff_out = ""
-    branch_diff_out = ""
-    code_out = ""
-    coverage_out = ""
-    coverage_pytest_completed = False
     status = "passed"
     standard_test_status = "not_run" if args.skip_coverage else "failed"
     failure_data: dict[str, Any] | None = None
@@ -401,86 +669,193 @@ def main() -> None:
     jscpd_dir = out_dir / "jscpd"
     jscpd_dir.mkdir(parents=True, exist_ok=True)
     jscpd_json = jscpd_dir / "jscpd-report.json"
-    jscpd_data = parse_jscpd_json(jscpd_json)
+    log_dir = out_dir / "logs"
+    health_cache_json = out_dir / "cache" / f"{project}__code_health_cache.json"
+    compact_args = ["--mode", args.mode, "--top", str(args.top), "--jscpd-json", str(jscpd_json)]
+    metrics_json = json_path.with_name(f"{json_path.stem}__metrics.json")
+    trend_db = args.trend_db.expanduser() if args.trend_db else out_dir / "code_health_trends.sqlite3"
+    compact_args.extend(["--cache-json", str(health_cache_json), "--metrics-json", str(metrics_json)])
+    if args.changed_only:
+        compact_args.extend(["--changed-only", "--fork-point", fork])
+
+    coverage_json = out_dir / "coverage.json"
+    coverage_data_dir = out_dir / "coverage-data"
+    # Sharded runs combine into <out-dir>/coverage-data/.coverage; serial runs keep the repo default.
+    coverage_env = (
+        {**os.environ, "COVERAGE_FILE": str(coverage_data_dir / ".coverage")} if args.coverage_shards > 1 else None
+    )
+    # Step outputs land here as each step finishes, so partial results survive a failure.
+    outputs: dict[str, str] = {}
 
-    try:
-        tracker.set_phase("diff", message=f"collecting diff summaries from fork point {fork}")
-        diff_out = run_python_script(
-            "diff_summary",
-            skill_dir / "diff_summary_compact.py",
-            ["--base", base_ref],
-            tracker=tracker,
-        )
-        branch_diff_out = run_python_script(
-            "diff_summary_deep",
-            skill_dir / "diff_summary_compact.py",
-            [
-                "--base",
-                base_ref,
-                "--deep",
-                "--all-files",
-                "--top-files",
-                str(args.top_files),
-            ],
-            tracker=tracker,
-        )
+    def record(step: str, action: Callable[[], str]) -> Callable[[], str]:
+        def run_and_record() -> str:
+            outputs[step] = action()
+            return outputs[step]
 
-        tracker.set_phase("duplication", message="running duplication scan")
-        jscpd_cmd = jscpd_command()
-        if jscpd_cmd:
-            run(
-                "duplication_jscpd",
+        return run_and_record
+
+    def run_duplication() -> str:
+        if args.duplication_engine == "native":
+            return run_python_script(
+                "duplication",
+                skill_dir / "duplication_scan.py",
                 [
-                    *jscpd_cmd,
-                    ".",
-                    "--reporters",
-                    "json",
                     "--output",
-                    str(jscpd_dir),
+                    str(jscpd_json),
                     "--min-lines",
                     "5",
                     "--min-tokens",
                     "70",
-                    "--mode",
-                    "weak",
-                    "--gitignore",
-                    "--silent",
                     "--ignore",
                     IGNORE,
+                    "--cache-json",
+                    str(out_dir / "cache" / f"{project}__duplication_cache.json"),
                 ],
-                check=False,
                 tracker=tracker,
             )
+        jscpd_cmd = jscpd_command()
+        if not jscpd_cmd:
+            return ""
+        return run(
+            "duplication",
+            [
+                *jscpd_cmd,
+                ".",
+                "--reporters",
+                "json",
+                "--output",
+                str(jscpd_dir),
+                "--min-lines",
+                "5",
+                "--min-tokens",
+                "70",
+                "--mode",
+                "weak",
+                "--gitignore",
+                "--silent",
+                "--ignore",
+                IGNORE,
+            ],
+            check=False,
+            tracker=tracker,
+            capture_limit_bytes=_CAPTURE_LIMIT_BYTES,
+            spill_dir=log_dir,
+        )
 
-        tracker.set_phase("static-analysis", message="running compact code-health analysis")
-        code_out = run_python_script(
-            "code_health_compact",
-            skill_dir / "code_health_compact.py",
-            ["--mode", args.mode, "--top", str(args.top), "--jscpd-json", str(jscpd_json)],
+    def run_diff_summaries() -> str:
+        # One script run (and one git pass per comparison) yields both the default and deep views.
+        combined = run_python_script(
+            "diff_summary",
+            skill_dir / "diff_summary_compact.py",
+            ["--base", base_ref, "--both-views", "--top-files", str(args.top_files)],
             tracker=tracker,
         )
+        normal, _, deep = combined.partition(DEEP_VIEW_MARKER)
+        outputs["diff_summary"] = normal.strip()
+        outputs["diff_summary_deep"] = deep.strip()
+        return combined
+
+    graph = [
+        GraphStep("diff_summary", run_diff_summaries),
+        GraphStep("duplication", record("duplication", run_duplication)),
+        GraphStep(
+            "code_health_compact",
+            record(
+                "code_health_compact",
+                lambda: run_python_script(
+                    "code_health_compact",
+                    skill_dir / "code_health_compact.py",
+                    compact_args,
+                    tracker=tracker,
+                ),
+            ),
+            depends_on=("duplication",),
+        ),
+    ]
+    if not args.skip_coverage:
+        tracker.set_artifact("coverage_json", str(coverage_json))
+        if args.coverage_shards <= 1:
+            # Sharded runs register one log per shard once the shards are known.
+            tracker.set_artifact("coverage_pytest_log", str(log_dir / "coverage_pytest.stdout.log"))
+        graph.extend(
+            [
+                GraphStep(
+                    "coverage_pytest",
+                    record(
+                        "coverage_pytest",
+                        lambda: run_module(
+                            "coverage_pytest",
+                            "pytest",
+                            ["--cov=stowage", "--cov=tui", "-q"],
+                            tracker=tracker,
+                            capture_limit_bytes=_CAPTURE_LIMIT_BYTES,
+                            spill_dir=log_dir,
+                        )
+                        if args.coverage_shards <= 1
+                        else run_sharded_coverage_pytest(
+                            args.coverage_shards, coverage_data_dir, tracker=tracker, log_dir=log_dir
+                        ),
+                    ),
+                ),
+                GraphStep(
+                    "coverage_json",
+                    record(
+                        "coverage_json",
+                        lambda: run_module(
+                            "coverage_json",
+                            "coverage",
+                            ["json", "-o", str(coverage_json)],
+                            tracker=tracker,
+                            env=coverage_env,
+                        ),
+                    ),
+                    depends_on=("coverage_pytest",),
+                ),
+                GraphStep(
+                    "coverage_hotspots",
+                    record(
+                        "coverage_hotspots",
+                        lambda: run_python_script(
+                            "coverage_hotspots",
+                            skill_dir / "coverage_hotspots.py",
+                            ["--coverage-json", str(coverage_json)],
+                            tracker=tracker,
+                        ),
+                    ),
+                    depends_on=("coverage_json",),
+                ),
+                GraphStep(
+                    "coverage_delta",
+                    record(
+                        "coverage_delta",
+                        lambda: run_python_script(
+                            "coverage_delta",
+                            skill_dir / "coverage_hotspots.py",
+                            ["--coverage-json", str(coverage_json), "--diff-base", fork, "--top", str(args.top_files)],
+                            tracker=tracker,
+                        ),
+                    ),
+                    depends_on=("coverage_json",),
+                ),
+            ]
+        )
 
+    # Taken before analysis starts: edits made while it runs leave the report stale.
+    tree_state = worktree_fingerprint(repo_root)
+    try:
+        tracker.set_phase(
+            "analysis",
+            message=f"running {len(graph)} code-health steps from fork point {fork} (jobs={args.jobs})",
+        )
+        run_step_graph(graph, max_workers=args.jobs)
         if not args.skip_coverage:
-            tracker.set_phase("coverage", message="running coverage-backed pytest")
-            coverage_json = out_dir / "coverage.json"
-            tracker.set_artifact("coverage_json", str(coverage_json))
-            run_module("coverage_pytest", "pytest", ["--cov=stowage", "--cov=tui", "-q"], tracker=tracker)
-            coverage_pytest_completed = True
-            run_module("coverage_json", "coverage", ["json", "-o", str(coverage_json)], tracker=tracker)
-            tracker.set_phase("coverage-report", message="building coverage hotspot report")
-            coverage_out = run_python_script(
-                "coverage_hotspots",
-                skill_dir / "coverage_hotspots.py",
-                ["--coverage-json", str(coverage_json)],
-                tracker=tracker,
-            )
             standard_test_status = "passed"
     except StepFailure as failure:
         status = "failed"
         failure_data = build_failure_metadata(
             failure,
             coverage_skipped=args.skip_coverage,
-            coverage_pytest_completed=coverage_pytest_completed,
+            coverage_pytest_completed="coverage_pytest" in outputs,
         )
         standard_test_status = failure_data["standard_test_status"]
         tracker.finish(
@@ -490,53 +865,126 @@ def main() -> None:
             standard_test_status=standard_test_status,
         )
 
-    jscpd_data = parse_jscpd_json(jscpd_json)
-
-    report_data = {
-        "project": project,
-        "branch": branch,
-        "mode": args.mode,
-        "top": args.top,
-        "top_files": args.top_files,
-        "base_ref": base_ref,
-        "fork_point": fork,
-        "main_ref": base_ref,
-        "duplication": jscpd_data,
-        "xenon_status": parse_xenon_status(code_out),
-        "coverage_skipped": args.skip_coverage,
-        "status": status,
-        "standard_test_status": standard_test_status,
-        "failure": failure_data,
-        "output_markdown": str(output_path),
-        "output_json": str(json_path),
-        "status_json": str(status_path) if status_path is not None else None,
-    }
+    def publish(
+        status: str,
+        standard_test_status: str,
+        failure_data: dict[str, Any] | None,
+        *,
+        refresh: bool,
+        tree_state: dict[str, str | None],
+    ) -> None:
+        jscpd_data = parse_jscpd_json(jscpd_json)
+        diff_out = outputs.get("diff_summary", "")
+        branch_diff_out = outputs.get("diff_summary_deep", "")
+        code_out = outputs.get("code_health_compact", "")
+        coverage_out = "\n\n".join(
+            part for part in (outputs.get("coverage_hotspots", ""), outputs.get("coverage_delta", "")) if part
+        )
 
-    tracker.set_phase("writing", message="writing code-health artifacts")
-    write_report(
-        output_path=output_path,
-        mode=args.mode,
-        top=args.top,
-        diff_out=diff_out,
-        branch_diff_out=branch_diff_out,
-        base_ref=base_ref,
-        fork_point=fork,
-        code_out=code_out,
-        coverage_out=coverage_out,
-        jscpd_data=jscpd_data,
-        coverage_skipped=args.skip_coverage,
-        status=status,
-        standard_test_status=standard_test_status,
-        failure=failure_data,
-    )
-    write_json(json_path, report_data)
-    if failure_data is None:
-        tracker.finish(
-            "passed",
-            message="code-health completed",
+        report_data = {
+            "project": project,
+            "branch": branch,
+            "mode": args.mode,
+            "top": args.top,
+            "top_files": args.top_files,
+            "base_ref": base_ref,
+            "fork_point": fork,
+            "main_ref": base_ref,
+            "duplication": jscpd_data,
+            "xenon_status": parse_xenon_status(code_out),
+            "analysis_cache": parse_analysis_cache(code_out),
+            "coverage_skipped": args.skip_coverage,
+            "status": status,
+            "standard_test_status": standard_test_status,
+            "failure": failure_data,
+            "output_markdown": str(output_path),
+            "output_json": str(json_path),
+            "status_json": str(status_path) if status_path is not None else None,
+            **tree_state,
+        }
+
+        timings = {"steps": tracker.step_timings(), "analyzers": load_analyzer_timings(metrics_json)}
+        report_data["timings"] = timings
+
+        trend = None
+        if failure_data is None and not refresh:
+            tracker.set_phase("trends", message=f"recording trend snapshot in {trend_db}")
+            trend = record_and_compare_trends(
+                trend_db,
+                project=project,
+                branch=branch,
+                report=report_data,
+                metrics_json=metrics_json,
+                coverage_json=None if args.skip_coverage else coverage_json,
+                compare_to=args.compare_to,
+            )
+            report_data["trend"] = trend
+
+        tracker.set_phase("writing", message="writing code-health artifacts")
+        write_report(
+            output_path=output_path,
+            mode=args.mode,
+            top=args.top,
+            diff_out=diff_out,
+            branch_diff_out=branch_diff_out,
+            base_ref=base_ref,
+            fork_point=fork,
+            code_out=code_out,
+            coverage_out=coverage_out,
+            jscpd_data=jscpd_data,
+            coverage_skipped=args.skip_coverage,
+            status=status,
             standard_test_status=standard_test_status,
-            xenon_status=report_data["xenon_status"],
+            failure=failure_data,
+            trend=trend,
+            timings=timings,
+            rotate=not refresh,
         )
+        write_json(json_path, report_data, rotate=not refresh)
+        # The tracker finished with the first run; refreshes only report phases.
+        if failure_data is None and not refresh:
+            tracker.finish(
+                "passed",
+                message="code-health completed",
+                standard_test_status=standard_test_status,
+                xenon_status=report_data["xenon_status"],
+            )
+
+    publish(status, standard_test_status, failure_data, refresh=False, tree_state=tree_state)
+
+    if args.watch:
+        # Refreshes re-run only the static steps. Unchanged files are served from the blob-SHA
+        # caches, vulture narrows to changed files plus importers, and coverage stays from the first run.
+        if not args.changed_only:
+            compact_args.extend(["--changed-only", "--fork-point", fork])
+        watch_steps = [step for step in graph if step.name in WATCH_STEPS]
+        tracker.set_phase("watching", message=f"watching {repo_root} for changes (Ctrl-C to stop)")
+        try:
+            for changed in watch_changes(repo_root, exclude=out_dir, interval=args.watch_interval):
+                tracker.set_phase("refreshing", message=f"{len(changed)} changed: {', '.join(changed[:3])}")
+                refresh_failure = None
+                try:
+                    run_step_graph(watch_steps, max_workers=args.jobs)
+                except StepFailure as failure:
+                    refresh_failure = build_failure_metadata(
+                        failure,
+                        coverage_skipped=args.skip_coverage,
+                        coverage_pytest_completed="coverage_pytest" in outputs,
+                    )
+                    tracker.log(f"refresh failed at step={failure.step}")
+                publish(
+                    "passed" if refresh_failure is None else "failed",
+                    standard_test_status,
+                    refresh_failure,
+                    refresh=True,
+                    # Coverage still comes from the first run, so refreshed reports are never reusable as current.
+                    tree_state={"head_sha": None, "worktree_hash": None},
+                )
+                outcome = "report refreshed" if refresh_failure is None else "refresh failed; report updated"
+                tracker.set_phase("watching", message=f"{outcome}; watching for changes")
+        except KeyboardInterrupt:
+            tracker.log("watch stopped")
+            return
 
     if failure_data is not None:
         raise SystemExit(1)
@@ -17,52 +17,42 @@ import json
 import re
 import subprocess
 import sys
+import textwrap
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, NamedTuple
 
-QUERY = """\
-query(
-  $owner: String!,
-  $repo: String!,
-  $number: Int!,
-  $commentsCursor: String,
-  $reviewsCursor: String,
-  $threadsCursor: String
-) {
-  repository(owner: $owner, name: $repo) {
-    pullRequest(number: $number) {
-      number
-      url
-      title
-      state
+COMMON_DIR = Path(__file__).resolve().parents[2] / "_common"
+if str(COMMON_DIR) not in sys.path:
+    sys.path.insert(0, str(COMMON_DIR))
+
+from gh_context import current_branch, fetch_repo_slug, find_git_root, resolve_upstream_pr
+from gh_http_cache import ResponseCache, replay_or_fetch
+
+# GraphQL POSTs carry no ETag, so pages are only replayed inside --cache-max-age.
+HTTP_CACHE = ResponseCache()
 
-      comments(first: 100, after: $commentsCursor) {
-        pageInfo { hasNextPage endCursor }
-        nodes {
+# GitHub caps every connection at 100 nodes per page.
+PAGE_SIZE = 100
+DEFAULT_JOBS = 4
+
+COMMENT_FIELDS = """
           id
           databaseId
           body
           createdAt
           updatedAt
-          author { login }
-        }
-      }
+          author { login }"""
 
-      reviews(first: 100, after: $reviewsCursor) {
-        pageInfo { hasNextPage endCursor }
-        nodes {
+REVIEW_FIELDS = """
           id
           databaseId
           state
           body
           submittedAt
-          author { login }
-        }
-      }
+          author { login }"""
 
-      reviewThreads(first: 100, after: $threadsCursor) {
-        pageInfo { hasNextPage endCursor }
-        nodes {
+THREAD_FIELDS = f"""
           id
           isResolved
           isOutdated
@@ -73,22 +63,78 @@ query(
           startDiffSide
           originalLine
           originalStartLine
-          resolvedBy { login }
-          comments(first: 100) {
-            nodes {
-              id
-              databaseId
-              body
-              createdAt
-              updatedAt
-              author { login }
-            }
-          }
-        }
-      }
-    }
-  }
+          resolvedBy {{ login }}
+          comments(first: {PAGE_SIZE}) {{
+            pageInfo {{ hasNextPage endCursor }}
+            nodes {{{textwrap.indent(COMMENT_FIELDS, "    ")}
+            }}
+          }}"""
+
+# GraphQL connection -> (output key, node fields).
+DIMENSIONS = {
+    "comments": ("conversation_comments", COMMENT_FIELDS),
+    "reviews": ("reviews", REVIEW_FIELDS),
+    "reviewThreads": ("review_threads", THREAD_FIELDS),
 }
+
+
+def connection_query(field: str, cursor_var: str) -> str:
+    return f"""
+      {field}(first: {PAGE_SIZE}, after: ${cursor_var}) {{
+        pageInfo {{ hasNextPage endCursor }}
+        nodes {{{DIMENSIONS[field][1]}
+        }}
+      }}
+"""
+
+
+# First round trip: PR metadata plus the first page of every dimension.
+QUERY = f"""\
+query(
+  $owner: String!,
+  $repo: String!,
+  $number: Int!,
+  $commentsCursor: String,
+  $reviewsCursor: String,
+  $threadsCursor: String
+) {{
+  repository(owner: $owner, name: $repo) {{
+    pullRequest(number: $number) {{
+      number
+      url
+      title
+      state
+{connection_query("comments", "commentsCursor")}{connection_query("reviews", "reviewsCursor")}{
+connection_query("reviewThreads", "threadsCursor")}    }}
+  }}
+}}
+"""
+
+# Follow-up pages touch only the dimension that still has a next page.
+PAGE_QUERIES = {
+    field: f"""\
+query($owner: String!, $repo: String!, $number: Int!, $cursor: String) {{
+  repository(owner: $owner, name: $repo) {{
+    pullRequest(number: $number) {{
+{connection_query(field, "cursor")}    }}
+  }}
+}}
+"""
+    for field in DIMENSIONS
+}
+
+THREAD_COMMENTS_QUERY = f"""\
+query($id: ID!, $cursor: String) {{
+  node(id: $id) {{
+    ... on PullRequestReviewThread {{
+      comments(first: {PAGE_SIZE}, after: $cursor) {{
+        pageInfo {{ hasNextPage endCursor }}
+        nodes {{{COMMENT_FIELDS}
+        }}
+      }}
+    }}
+  }}
+}}
 """
 
 
@@ -138,19 +184,19 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="GitHub repository slug (owner/repo) for PR lookup override.",
     )
-    return parser.parse_args()
-
-
-def find_git_root(start: Path) -> Path | None:
-    result = subprocess.run(
-        ["git", "rev-parse", "--show-toplevel"],
-        cwd=start,
-        text=True,
-        capture_output=True,
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=0,
+        help="Replay GraphQL pages fetched within this many seconds from $CODEX_HOME/cache/gh-http.",
     )
-    if result.returncode != 0:
-        return None
-    return Path(result.stdout.strip())
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Concurrent GraphQL requests once the first page shows more to fetch.",
+    )
+    return parser.parse_args()
 
 
 def _ensure_gh_authenticated(repo_root: Path) -> None:
@@ -163,56 +209,6 @@ def _ensure_gh_authenticated(repo_root: Path) -> None:
         ) from None
 
 
-def fetch_repo_slug(repo_root: Path) -> str | None:
-    try:
-        data = _run_json(gh_cmd(["repo", "view", "--json", "nameWithOwner"]), cwd=repo_root)
-    except RuntimeError:
-        return None
-    slug = data.get("nameWithOwner")
-    return str(slug) if slug else None
-
-
-def fetch_repo_info(repo_root: Path) -> dict[str, Any] | None:
-    try:
-        data = _run_json(
-            gh_cmd(["repo", "view", "--json", "nameWithOwner,isFork,parent"]),
-            cwd=repo_root,
-        )
-    except RuntimeError:
-        return None
-    return data if isinstance(data, dict) else None
-
-
-def parse_parent_slug(repo_info: dict[str, Any]) -> str | None:
-    parent = repo_info.get("parent")
-    if not isinstance(parent, dict):
-        return None
-    name_with_owner = parent.get("nameWithOwner")
-    if name_with_owner:
-        return str(name_with_owner)
-    owner = parent.get("owner")
-    name = parent.get("name")
-    login = owner.get("login") if isinstance(owner, dict) else None
-    if login and name:
-        return f"{login}/{name}"
-    return None
-
-
-def current_branch(repo_root: Path) -> str | None:
-    result = subprocess.run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-        cwd=repo_root,
-        text=True,
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        return None
-    branch = result.stdout.strip()
-    if not branch or branch == "HEAD":
-        return None
-    return branch
-
-
 def parse_pr_url(pr_value: str) -> tuple[str, int] | None:
     match = re.search(r"github\.com/([^/]+/[^/]+)/pull/(\d+)", pr_value)
     if not match:
@@ -275,86 +271,17 @@ def resolve_current_repo_pr(repo_root: Path, gh_repo: str | None) -> TargetPR |
 
 
 def resolve_upstream_pr_for_fork(repo_root: Path) -> TargetPR | None:
-    info = fetch_repo_info(repo_root)
-    if not info or not bool(info.get("isFork")):
-        return None
-
-    current_slug = str(info.get("nameWithOwner") or "")
-    current_owner = current_slug.split("/", 1)[0] if "/" in current_slug else ""
-    parent_slug = parse_parent_slug(info)
-    branch = current_branch(repo_root)
-    if not current_owner or not parent_slug or not branch:
-        return None
-
-    prs = fetch_upstream_pr_candidates(repo_root, parent_slug, current_owner, branch)
-
-    if not isinstance(prs, list) or not prs:
+    upstream = resolve_upstream_pr(repo_root)
+    if upstream is None:
         return None
-
-    candidates = [p for p in prs if isinstance(p, dict) and p.get("number")]
-    if not candidates:
-        return None
-
-    candidates.sort(key=lambda p: str(p.get("updatedAt") or ""), reverse=True)
-    chosen = candidates[0]
     return TargetPR(
-        repo_slug=parent_slug,
-        pr=int(chosen["number"]),
-        url=str(chosen.get("url") or "") or None,
+        repo_slug=upstream.repo_slug,
+        pr=upstream.number,
+        url=upstream.url,
         source="fork-upstream-head-branch",
     )
 
 
-def fetch_upstream_pr_candidates(
-    repo_root: Path, parent_slug: str, current_owner: str, branch: str
-) -> list[dict[str, Any]] | None:
-    fields = "number,url,updatedAt"
-    try:
-        primary = _run_json(
-            gh_cmd(
-                [
-                    "pr",
-                    "list",
-                    "--state",
-                    "open",
-                    "--head",
-                    f"{current_owner}:{branch}",
-                    "--json",
-                    fields,
-                ],
-                gh_repo=parent_slug,
-            ),
-            cwd=repo_root,
-        )
-    except RuntimeError:
-        primary = []
-
-    if isinstance(primary, list) and primary:
-        return primary
-
-    try:
-        fallback = _run_json(
-            gh_cmd(
-                [
-                    "pr",
-                    "list",
-                    "--state",
-                    "open",
-                    "--search",
-                    f"head:{branch} author:{current_owner}",
-                    "--json",
-                    fields,
-                ],
-                gh_repo=parent_slug,
-            ),
-            cwd=repo_root,
-        )
-    except RuntimeError:
-        return None
-
-    return fallback if isinstance(fallback, list) else None
-
-
 def resolve_target_pr(pr_value: str | None, gh_repo: str | None, repo_root: Path) -> TargetPR | None:
     if pr_value:
         return resolve_explicit_pr(pr_value, gh_repo, repo_root)
@@ -369,96 +296,105 @@ def resolve_target_pr(pr_value: str | None, gh_repo: str | None, repo_root: Path
     return resolve_upstream_pr_for_fork(repo_root)
 
 
-def gh_api_graphql(
-    owner: str,
-    repo: str,
-    number: int,
-    comments_cursor: str | None = None,
-    reviews_cursor: str | None = None,
-    threads_cursor: str | None = None,
-) -> dict[str, Any]:
-    cmd = [
-        "gh",
-        "api",
-        "graphql",
-        "-F",
-        "query=@-",
-        "-F",
-        f"owner={owner}",
-        "-F",
-        f"repo={repo}",
-        "-F",
-        f"number={number}",
-    ]
-    if comments_cursor:
-        cmd += ["-F", f"commentsCursor={comments_cursor}"]
-    if reviews_cursor:
-        cmd += ["-F", f"reviewsCursor={reviews_cursor}"]
-    if threads_cursor:
-        cmd += ["-F", f"threadsCursor={threads_cursor}"]
-
-    return _run_json(cmd, stdin=QUERY)
-
-
-def fetch_all(owner: str, repo: str, number: int) -> dict[str, Any]:
-    conversation_comments: list[dict[str, Any]] = []
-    reviews: list[dict[str, Any]] = []
-    review_threads: list[dict[str, Any]] = []
-
-    comments_cursor: str | None = None
-    reviews_cursor: str | None = None
-    threads_cursor: str | None = None
-
-    pr_meta: dict[str, Any] | None = None
-
-    while True:
-        payload = gh_api_graphql(
-            owner=owner,
-            repo=repo,
-            number=number,
-            comments_cursor=comments_cursor,
-            reviews_cursor=reviews_cursor,
-            threads_cursor=threads_cursor,
+def gh_api_graphql(query: str, variables: dict[str, Any], max_age_sec: float = 0) -> dict[str, Any]:
+    cmd = ["gh", "api", "graphql", "-F", "query=@-"]
+    for name, value in variables.items():
+        if value is not None:
+            cmd += ["-F", f"{name}={value}"]
+
+    key = json.dumps(["fetch_comments", query, cmd[5:]])
+    out = replay_or_fetch(HTTP_CACHE, key, lambda: _run(cmd, stdin=query).encode(), max_age_sec=max_age_sec)
+    try:
+        payload = json.loads(out)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Failed to parse JSON from command output: {e}\nRaw:\n{out.decode()}") from e
+    if "errors" in payload and payload["errors"]:
+        raise RuntimeError(f"GitHub GraphQL errors:\n{json.dumps(payload['errors'], indent=2)}")
+    return payload["data"]
+
+
+def next_cursor(connection: dict[str, Any]) -> str | None:
+    page_info = connection["pageInfo"]
+    return page_info["endCursor"] if page_info["hasNextPage"] else None
+
+
+def fetch_remaining_pages(
+    owner: str, repo: str, number: int, field: str, cursor: str | None, max_age_sec: float
+) -> list[dict[str, Any]]:
+    nodes: list[dict[str, Any]] = []
+    while cursor:
+        data = gh_api_graphql(
+            PAGE_QUERIES[field],
+            {"owner": owner, "repo": repo, "number": number, "cursor": cursor},
+            max_age_sec,
         )
+        connection = data["repository"]["pullRequest"][field]
+        nodes.extend(connection.get("nodes") or [])
+        cursor = next_cursor(connection)
+    return nodes
+
+
+def fetch_thread_comments(thread: dict[str, Any], max_age_sec: float) -> None:
+    comments = thread["comments"]
+    cursor = next_cursor(comments)
+    while cursor:
+        data = gh_api_graphql(THREAD_COMMENTS_QUERY, {"id": thread["id"], "cursor": cursor}, max_age_sec)
+        connection = data["node"]["comments"]
+        comments["nodes"].extend(connection.get("nodes") or [])
+        cursor = next_cursor(connection)
+
+
+def fetch_all(owner: str, repo: str, number: int, max_age_sec: float = 0, jobs: int = DEFAULT_JOBS) -> dict[str, Any]:
+    """Fetch every comment, review and thread; each dimension pages on its own cursor.
+
+    After the combined first page, dimensions with more pages (and threads with
+    more than one page of comments) are fetched concurrently, each query asking
+    only for the connection it still needs.
+    """
+    pr = gh_api_graphql(QUERY, {"owner": owner, "repo": repo, "number": number}, max_age_sec)["repository"][
+        "pullRequest"
+    ]
+    pr_meta = {
+        "number": pr["number"],
+        "url": pr["url"],
+        "title": pr["title"],
+        "state": pr["state"],
+        "owner": owner,
+        "repo": repo,
+    }
+    records = {field: list(pr[field].get("nodes") or []) for field in DIMENSIONS}
 
-        if "errors" in payload and payload["errors"]:
-            raise RuntimeError(f"GitHub GraphQL errors:\n{json.dumps(payload['errors'], indent=2)}")
-
-        pr = payload["data"]["repository"]["pullRequest"]
-        if pr_meta is None:
-            pr_meta = {
-                "number": pr["number"],
-                "url": pr["url"],
-                "title": pr["title"],
-                "state": pr["state"],
-                "owner": owner,
-                "repo": repo,
-            }
-
-        c = pr["comments"]
-        r = pr["reviews"]
-        t = pr["reviewThreads"]
-
-        conversation_comments.extend(c.get("nodes") or [])
-        reviews.extend(r.get("nodes") or [])
-        review_threads.extend(t.get("nodes") or [])
-
-        comments_cursor = c["pageInfo"]["endCursor"] if c["pageInfo"]["hasNextPage"] else None
-        reviews_cursor = r["pageInfo"]["endCursor"] if r["pageInfo"]["hasNextPage"] else None
-        threads_cursor = t["pageInfo"]["endCursor"] if t["pageInfo"]["hasNextPage"] else None
-
-        if not (comments_cursor or reviews_cursor or threads_cursor):
-            break
-
-    assert pr_meta is not None
-    _add_rest_ids(conversation_comments)
-    _add_rest_ids(reviews)
-    _add_rest_ids(review_threads)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+
+        def submit_thread_comments(threads: list[dict[str, Any]]) -> list[Future[None]]:
+            return [
+                pool.submit(fetch_thread_comments, thread, max_age_sec)
+                for thread in threads
+                if next_cursor(thread["comments"])
+            ]
+
+        pages = {
+            pool.submit(fetch_remaining_pages, owner, repo, number, field, next_cursor(pr[field]), max_age_sec): field
+            for field in DIMENSIONS
+            if next_cursor(pr[field])
+        }
+        thread_jobs = submit_thread_comments(records["reviewThreads"])
+        for future in as_completed(pages):
+            field = pages[future]
+            nodes = future.result()
+            records[field].extend(nodes)
+            if field == "reviewThreads":
+                thread_jobs += submit_thread_comments(nodes)
+        for future in thread_jobs:
+            future.result()
+
+    for thread in records["reviewThreads"]:
+        thread["comments"].pop("pageInfo", None)
+    for records_of_field in records.values():
+        _add_rest_ids(records_of_field)
     return {
         "pull_request": pr_meta,
-        "conversation_comments": conversation_comments,
-        "reviews": reviews,
-        "review_threads": review_threads,
+        **{DIMENSIONS[field][0]: records[field] for field in DIMENSIONS},
     }
 
 
@@ -500,7 +436,7 @@ def main() -> None:
         )
 
     owner, repo = target.repo_slug.split("/", 1)
-    result = fetch_all(owner, repo, target.pr)
+    result = fetch_all(owner, repo, target.pr, max_age_sec=args.cache_max_age, jobs=args.jobs)
     result["resolution"] = {
         "repo": target.repo_slug,
         "pr": target.pr,
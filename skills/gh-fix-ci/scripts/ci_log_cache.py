@@ -0,0 +1,96 @@
+"""On-disk cache of completed GitHub Actions logs.
+
+Logs of a completed run attempt or job never change, so they are stored
+gzip-compressed keyed by repo and run attempt/job id and replayed instead of
+re-downloaded. Total size is bounded with least-recently-used eviction.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    codex_home = Path(os.environ.get("CODEX_HOME", str(Path.home() / ".codex"))).expanduser()
+    return codex_home / "cache" / "ci-logs"
+
+
+class LogWriter:
+    """Compressed temp file that only becomes a cache entry on commit()."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: IO[bytes] = gzip.open(self.temp_path, "wb", compresslevel=6)
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+class LogCache:
+    def __init__(self, root: Path | None = None, *, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True) -> None:
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pruned = False
+
+    def path(self, repo_slug: str, kind: str, ident: str) -> Path:
+        return self.root / repo_slug.replace("/", "__") / f"{kind}-{ident}.log.gz"
+
+    def open_chunks(self, repo_slug: str, kind: str, ident: str) -> Iterator[bytes] | None:
+        if not self.enabled:
+            return None
+        path = self.path(repo_slug, kind, ident)
+        try:
+            handle = gzip.open(path, "rb")
+            os.utime(path)
+        except OSError:
+            return None
+        return _read_lines(handle)
+
+    def writer(self, repo_slug: str, kind: str, ident: str) -> LogWriter | None:
+        if not self.enabled:
+            return None
+        self.prune()
+        try:
+            return LogWriter(self.path(repo_slug, kind, ident))
+        except OSError:
+            return None
+
+    def prune(self) -> None:
+        with self._lock:
+            if self._pruned:
+                return
+            self._pruned = True
+        try:
+            entries = [(path.stat(), path) for path in self.root.glob("*/*.log.gz")]
+        except OSError:
+            return
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in sorted(entries, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+
+def _read_lines(handle: IO[bytes]) -> Iterator[bytes]:
+    with handle:
+        yield from handle
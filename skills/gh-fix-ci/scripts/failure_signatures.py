@@ -0,0 +1,123 @@
+"""Index of normalized CI failure signatures.
+
+A signature is a hash of the failure snippet with volatile tokens (timestamps,
+hashes, durations, addresses, temp paths) replaced, so the same failure seen in
+another run matches without re-scanning that run's log.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ci_log_cache import default_cache_dir
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS failure_signatures (
+        repo TEXT NOT NULL,
+        run_id TEXT NOT NULL,
+        check_name TEXT NOT NULL,
+        job_id TEXT,
+        signature TEXT NOT NULL,
+        pr TEXT,
+        workflow TEXT,
+        head_sha TEXT,
+        details_url TEXT,
+        recorded_at TEXT NOT NULL,
+        PRIMARY KEY (repo, run_id, check_name)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS failure_signatures_by_signature ON failure_signatures (repo, signature, recorded_at)",
+)
+NORMALIZERS = (
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b"), "<time>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE), "<addr>"),
+    (re.compile(r"\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,64}\b", re.IGNORECASE), "<hash>"),
+    (re.compile(r"\b\d+(?:\.\d+)?\s?(?:ms|s|sec|secs|seconds|m|min|mins|minutes)\b"), "<dur>"),
+    (re.compile(r"/tmp/[^\s/:]+"), "/tmp/<tmp>"),
+    (re.compile(r"[ \t]+"), " "),
+)
+
+
+def default_index_path() -> Path:
+    return default_cache_dir() / "failure_signatures.sqlite3"
+
+
+def normalize_snippet(snippet: str) -> str:
+    lines = []
+    for line in snippet.splitlines():
+        for pattern, replacement in NORMALIZERS:
+            line = pattern.sub(replacement, line)
+        line = line.strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def failure_signature(snippet: str) -> str | None:
+    normalized = normalize_snippet(snippet)
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode()).hexdigest()[:20]
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=30)
+    for statement in SCHEMA:
+        connection.execute(statement)
+    return connection
+
+
+def record_and_match(
+    db_path: Path,
+    *,
+    repo: str,
+    run_id: str,
+    check_name: str,
+    signature: str,
+    job_id: str | None,
+    pr: str | None,
+    run: dict[str, Any],
+    details_url: str,
+    limit: int = 5,
+) -> list[dict[str, Any]]:
+    """Record this failure and return earlier runs that failed with the same signature."""
+    connection = connect(db_path)
+    try:
+        with connection:
+            cursor = connection.execute(
+                # One row per earlier run: SQLite takes the bare columns from the MAX(recorded_at) row.
+                "SELECT run_id, check_name, pr, workflow, head_sha, details_url, MAX(recorded_at) AS recorded_at "
+                "FROM failure_signatures WHERE repo = ? AND signature = ? AND run_id != ? "
+                "GROUP BY run_id ORDER BY recorded_at DESC LIMIT ?",
+                (repo, signature, run_id, limit),
+            )
+            columns = [column[0] for column in cursor.description]
+            matches = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            connection.execute(
+                "INSERT OR REPLACE INTO failure_signatures (repo, run_id, check_name, job_id, signature, pr, "
+                "workflow, head_sha, details_url, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    repo,
+                    run_id,
+                    check_name,
+                    job_id,
+                    signature,
+                    pr,
+                    run.get("workflowName") or run.get("name"),
+                    run.get("headSha"),
+                    details_url,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+    finally:
+        connection.close()
+    return matches
@@ -4,12 +4,26 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sqlite3
 import subprocess
 import sys
+import threading
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from shutil import which
 from typing import Any, Iterable, NamedTuple, Sequence
 
+COMMON_DIR = Path(__file__).resolve().parents[2] / "_common"
+if str(COMMON_DIR) not in sys.path:
+    sys.path.insert(0, str(COMMON_DIR))
+
+from ci_log_cache import LogCache, LogWriter
+from failure_signatures import default_index_path, failure_signature, record_and_match
+from gh_context import fetch_repo_slug, find_git_root, resolve_upstream_pr
+
 FAILURE_CONCLUSIONS = {
     "failure",
     "cancelled",
@@ -42,10 +56,13 @@ FAILURE_MARKERS = (
 
 DEFAULT_MAX_LINES = 160
 DEFAULT_CONTEXT_LINES = 30
+DEFAULT_JOBS = 4
 PENDING_LOG_MARKERS = (
     "still in progress",
     "log will be available when it is complete",
 )
+# Logs of completed run attempts and jobs are immutable and replayed from here instead of re-downloaded.
+LOG_CACHE = LogCache()
 
 
 class TargetPR(NamedTuple):
@@ -55,6 +72,12 @@ class TargetPR(NamedTuple):
     source: str = "unknown"
 
 
+class LogScan(NamedTuple):
+    snippet: str
+    tail: str
+    cached: bool = False
+
+
 class GhResult:
     def __init__(self, returncode: int, stdout: str, stderr: str):
         self.returncode = returncode
@@ -76,22 +99,6 @@ def run_gh_command(args: Sequence[str], cwd: Path, gh_repo: str | None = None) -
     return GhResult(process.returncode, process.stdout, process.stderr)
 
 
-def run_gh_command_raw(
-    args: Sequence[str], cwd: Path, gh_repo: str | None = None
-) -> tuple[int, bytes, str]:
-    cmd = ["gh"]
-    if gh_repo:
-        cmd.extend(["-R", gh_repo])
-    cmd.extend(args)
-    process = subprocess.run(
-        cmd,
-        cwd=cwd,
-        capture_output=True,
-    )
-    stderr = process.stderr.decode(errors="replace")
-    return process.returncode, process.stdout, stderr
-
-
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
@@ -115,6 +122,20 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--max-lines", type=int, default=DEFAULT_MAX_LINES)
     parser.add_argument("--context", type=int, default=DEFAULT_CONTEXT_LINES)
     parser.add_argument("--json", action="store_true", help="Emit JSON instead of text output.")
+    parser.add_argument(
+        "--jobs", type=int, default=DEFAULT_JOBS, help="Failing checks analyzed concurrently."
+    )
+    parser.add_argument(
+        "--no-log-cache",
+        action="store_true",
+        help="Always download logs instead of replaying completed ones from $CODEX_HOME/cache/ci-logs.",
+    )
+    parser.add_argument(
+        "--signature-db",
+        type=Path,
+        default=default_index_path(),
+        help="SQLite index of failure signatures used to spot repeats across runs.",
+    )
     return parser.parse_args()
 
 
@@ -127,6 +148,7 @@ def main() -> int:
 
     if not ensure_gh_available(repo_root):
         return 1
+    LOG_CACHE.enabled = not args.no_log_cache
 
     target = resolve_target_pr(args.pr, args.gh_repo, repo_root)
     if target is None:
@@ -155,18 +177,24 @@ def main() -> int:
             print(f"{target.repo_slug} PR #{target.pr}: no failing checks detected.")
         return 0
 
-    results = []
-    for check in failing:
-        results.append(
-            analyze_check(
-                check,
-                repo_root=repo_root,
-                repo_slug=target.repo_slug,
-                max_lines=max(1, args.max_lines),
-                context=max(1, args.context),
-            )
+    # Checks from the same workflow run share one metadata fetch and one log scan.
+    memo = Memo()
+
+    def analyze(check: dict[str, Any]) -> dict[str, Any]:
+        return analyze_check(
+            check,
+            repo_root=repo_root,
+            repo_slug=target.repo_slug,
+            max_lines=max(1, args.max_lines),
+            context=max(1, args.context),
+            memo=memo,
+            pr=target.pr,
+            signature_db=args.signature_db,
         )
 
+    with ThreadPoolExecutor(max_workers=max(1, min(args.jobs, len(failing)))) as pool:
+        results = list(pool.map(analyze, failing))
+
     if args.json:
         print(
             json.dumps(
@@ -186,18 +214,6 @@ def main() -> int:
     return 1
 
 
-def find_git_root(start: Path) -> Path | None:
-    result = subprocess.run(
-        ["git", "rev-parse", "--show-toplevel"],
-        cwd=start,
-        text=True,
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        return None
-    return Path(result.stdout.strip())
-
-
 def ensure_gh_available(repo_root: Path) -> bool:
     if which("gh") is None:
         print("Error: gh is not installed or not on PATH.", file=sys.stderr)
@@ -287,88 +303,17 @@ def resolve_current_repo_pr(repo_root: Path, gh_repo: str | None) -> TargetPR |
 
 
 def resolve_upstream_pr_for_fork(repo_root: Path) -> TargetPR | None:
-    repo_info = fetch_repo_info(repo_root)
-    if not repo_info:
-        return None
-    if not bool(repo_info.get("isFork")):
+    upstream = resolve_upstream_pr(repo_root)
+    if upstream is None:
         return None
-
-    current_slug = str(repo_info.get("nameWithOwner") or "")
-    current_owner = current_slug.split("/", 1)[0] if "/" in current_slug else ""
-    parent_slug = parse_parent_slug(repo_info)
-    if not current_owner or not parent_slug:
-        return None
-
-    branch = current_branch(repo_root)
-    if not branch:
-        return None
-
-    prs = fetch_upstream_pr_candidates(repo_root, parent_slug, current_owner, branch)
-    if not isinstance(prs, list) or not prs:
-        return None
-
-    prs = [p for p in prs if isinstance(p, dict) and p.get("number")]
-    if not prs:
-        return None
-    prs.sort(key=lambda p: str(p.get("updatedAt") or ""), reverse=True)
-    selected = prs[0]
     return TargetPR(
-        repo_slug=parent_slug,
-        pr=str(selected["number"]),
-        url=str(selected.get("url") or "") or None,
+        repo_slug=upstream.repo_slug,
+        pr=str(upstream.number),
+        url=upstream.url,
         source="fork-upstream-head-branch",
     )
 
 
-def fetch_upstream_pr_candidates(
-    repo_root: Path, parent_slug: str, current_owner: str, branch: str
-) -> list[dict[str, Any]] | None:
-    fields = "number,url,updatedAt"
-    primary = run_gh_command(
-        [
-            "pr",
-            "list",
-            "--state",
-            "open",
-            "--head",
-            f"{current_owner}:{branch}",
-            "--json",
-            fields,
-        ],
-        cwd=repo_root,
-        gh_repo=parent_slug,
-    )
-    if primary.returncode == 0:
-        try:
-            primary_list = json.loads(primary.stdout or "[]")
-        except json.JSONDecodeError:
-            primary_list = []
-        if isinstance(primary_list, list) and primary_list:
-            return primary_list
-
-    fallback = run_gh_command(
-        [
-            "pr",
-            "list",
-            "--state",
-            "open",
-            "--search",
-            f"head:{branch} author:{current_owner}",
-            "--json",
-            fields,
-        ],
-        cwd=repo_root,
-        gh_repo=parent_slug,
-    )
-    if fallback.returncode != 0:
-        return None
-    try:
-        fallback_list = json.loads(fallback.stdout or "[]")
-    except json.JSONDecodeError:
-        return None
-    return fallback_list if isinstance(fallback_list, list) else None
-
-
 def fetch_checks(pr_value: str, repo_root: Path, repo_slug: str) -> list[dict[str, Any]] | None:
     primary_fields = ["name", "state", "conclusion", "detailsUrl", "startedAt", "completedAt"]
     result = run_gh_command(
@@ -433,7 +378,11 @@ def analyze_check(
     repo_slug: str,
     max_lines: int,
     context: int,
+    memo: Memo | None = None,
+    pr: str | None = None,
+    signature_db: Path | None = None,
 ) -> dict[str, Any]:
+    memo = memo or Memo()
     url = check.get("detailsUrl") or check.get("link") or ""
     run_id = extract_run_id(url)
     job_id = extract_job_id(url)
@@ -449,12 +398,17 @@ def analyze_check(
         base["note"] = "No GitHub Actions run id detected in detailsUrl."
         return base
 
-    metadata = fetch_run_metadata(run_id, repo_root, repo_slug)
-    log_text, log_error, log_status = fetch_check_log(
+    metadata = memo.get(("run", run_id), lambda: fetch_run_metadata(run_id, repo_root, repo_slug))
+    scan, log_error, log_status = fetch_check_log(
         run_id=run_id,
         job_id=job_id,
         repo_root=repo_root,
         repo_slug=repo_slug,
+        max_lines=max_lines,
+        context=context,
+        memo=memo,
+        attempt=run_attempt(metadata),
+        cacheable=(metadata or {}).get("status") == "completed",
     )
 
     if log_status == "pending":
@@ -471,11 +425,28 @@ def analyze_check(
             base["run"] = metadata
         return base
 
-    snippet = extract_failure_snippet(log_text, max_lines=max_lines, context=context)
     base["status"] = "ok"
     base["run"] = metadata or {}
-    base["logSnippet"] = snippet
-    base["logTail"] = tail_lines(log_text, max_lines)
+    base["logSnippet"] = scan.snippet
+    base["logTail"] = scan.tail
+    base["logCached"] = scan.cached
+    signature = failure_signature(scan.snippet)
+    if signature and signature_db is not None:
+        base["failureSignature"] = signature
+        try:
+            base["sameFailureAs"] = record_and_match(
+                signature_db,
+                repo=repo_slug,
+                run_id=run_id,
+                check_name=str(base["name"]),
+                signature=signature,
+                job_id=job_id,
+                pr=pr,
+                run=metadata or {},
+                details_url=url,
+            )
+        except sqlite3.Error as exc:
+            base["signatureError"] = str(exc)
     return base
 
 
@@ -511,6 +482,7 @@ def fetch_run_metadata(run_id: str, repo_root: Path, repo_slug: str) -> dict[str
         "headBranch",
         "headSha",
         "url",
+        "attempt",
     ]
     result = run_gh_command(
         ["run", "view", run_id, "--json", ",".join(fields)],
@@ -528,111 +500,139 @@ def fetch_run_metadata(run_id: str, repo_root: Path, repo_slug: str) -> dict[str
     return data
 
 
+def run_attempt(metadata: dict[str, Any] | None) -> int | None:
+    attempt = (metadata or {}).get("attempt")
+    return attempt if isinstance(attempt, int) and attempt > 0 else None
+
+
 def fetch_check_log(
     run_id: str,
     job_id: str | None,
     repo_root: Path,
     repo_slug: str,
-) -> tuple[str, str, str]:
-    log_text, log_error = fetch_run_log(run_id, repo_root, repo_slug)
+    max_lines: int,
+    context: int,
+    memo: Memo,
+    attempt: int | None,
+    cacheable: bool,
+) -> tuple[LogScan | None, str, str]:
+    scan, log_error = memo.get(
+        ("run-log", run_id),
+        lambda: fetch_run_log(run_id, attempt, repo_root, repo_slug, max_lines, context, cacheable),
+    )
     if not log_error:
-        return log_text, "", "ok"
+        return scan, "", "ok"
 
     if is_log_pending_message(log_error) and job_id:
-        job_log, job_error = fetch_job_log(job_id, repo_root, repo_slug)
-        if job_log:
-            return job_log, "", "ok"
+        job_scan, job_error = memo.get(
+            ("job-log", job_id), lambda: fetch_job_log(job_id, repo_root, repo_slug, max_lines, context)
+        )
+        if job_scan is not None:
+            return job_scan, "", "ok"
         if job_error and is_log_pending_message(job_error):
-            return "", job_error, "pending"
+            return None, job_error, "pending"
         if job_error:
-            return "", job_error, "error"
-        return "", log_error, "pending"
+            return None, job_error, "error"
+        return None, log_error, "pending"
 
     if is_log_pending_message(log_error):
-        return "", log_error, "pending"
-
-    return "", log_error, "error"
-
-
-def fetch_run_log(run_id: str, repo_root: Path, repo_slug: str) -> tuple[str, str]:
-    result = run_gh_command(["run", "view", run_id, "--log"], cwd=repo_root, gh_repo=repo_slug)
-    if result.returncode != 0:
-        error = (result.stderr or result.stdout or "").strip()
-        return "", error or "gh run view failed"
-    return result.stdout, ""
+        return None, log_error, "pending"
 
+    return None, log_error, "error"
 
-def fetch_job_log(job_id: str, repo_root: Path, repo_slug: str) -> tuple[str, str]:
-    endpoint = f"/repos/{repo_slug}/actions/jobs/{job_id}/logs"
-    returncode, stdout_bytes, stderr = run_gh_command_raw(
-        ["api", endpoint], cwd=repo_root, gh_repo=repo_slug
-    )
-    if returncode != 0:
-        message = (stderr or stdout_bytes.decode(errors="replace")).strip()
-        return "", message or "gh api job logs failed"
-    if is_zip_payload(stdout_bytes):
-        return "", "Job logs returned a zip archive; unable to parse."
-    return stdout_bytes.decode(errors="replace"), ""
 
+def fetch_run_log(
+    run_id: str,
+    attempt: int | None,
+    repo_root: Path,
+    repo_slug: str,
+    max_lines: int,
+    context: int,
+    cacheable: bool,
+) -> tuple[LogScan | None, str]:
+    # A re-run keeps the run id and `gh run view --log` follows the latest attempt,
+    # so entries are per attempt; without a known attempt the cache is bypassed.
+    ident = f"{run_id}-attempt{attempt}" if attempt is not None else None
+    if ident is not None:
+        cached = scan_cached_log(repo_slug, "run", ident, max_lines, context)
+        if cached is not None:
+            return cached, ""
+    writer = LOG_CACHE.writer(repo_slug, "run", ident) if cacheable and ident is not None else None
+    cmd = ["gh", "-R", repo_slug, "run", "view", run_id, "--log"]
+    return scan_gh_stream(cmd, repo_root, writer, max_lines, context, failure="gh run view failed")
+
+
+def fetch_job_log(
+    job_id: str, repo_root: Path, repo_slug: str, max_lines: int, context: int
+) -> tuple[LogScan | None, str]:
+    cached = scan_cached_log(repo_slug, "job", job_id, max_lines, context)
+    if cached is not None:
+        return cached, ""
+    # The job-logs endpoint only serves logs of finished jobs, so they are safe to keep.
+    writer = LOG_CACHE.writer(repo_slug, "job", job_id)
+    cmd = ["gh", "api", f"/repos/{repo_slug}/actions/jobs/{job_id}/logs"]
+    return scan_gh_stream(cmd, repo_root, writer, max_lines, context, failure="gh api job logs failed")
+
+
+def scan_gh_stream(
+    cmd: list[str], repo_root: Path, writer: LogWriter | None, max_lines: int, context: int, *, failure: str
+) -> tuple[LogScan | None, str]:
+    """Scan a gh command's stdout as it streams, teeing it into writer; logs can be hundreds of MB."""
+    process = subprocess.Popen(cmd, cwd=repo_root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr_chunks: list[bytes] = []
+    stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_thread.start()
+    zipped = False
+
+    def reject_zip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        nonlocal zipped
+        for index, chunk in enumerate(chunks):
+            if index == 0 and is_zip_payload(chunk):
+                zipped = True
+                return
+            yield chunk
 
-def fetch_repo_slug(repo_root: Path) -> str | None:
-    result = run_gh_command(["repo", "view", "--json", "nameWithOwner"], cwd=repo_root)
-    if result.returncode != 0:
-        return None
     try:
-        data = json.loads(result.stdout or "{}")
-    except json.JSONDecodeError:
-        return None
-    name_with_owner = data.get("nameWithOwner")
-    if not name_with_owner:
-        return None
-    return str(name_with_owner)
-
-
-def fetch_repo_info(repo_root: Path) -> dict[str, Any] | None:
-    result = run_gh_command(
-        ["repo", "view", "--json", "nameWithOwner,isFork,parent"],
-        cwd=repo_root,
-    )
-    if result.returncode != 0:
+        chunks = reject_zip(process.stdout)
+        if writer is not None:
+            chunks = tee_chunks(chunks, writer.write)
+        scan = scan_log_lines(iter_text_lines(chunks), max_lines=max_lines, context=context)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        process.kill()
+        raise
+    if zipped:
+        process.kill()
+    returncode = process.wait()
+    stderr_thread.join()
+    if zipped or returncode != 0:
+        if writer is not None:
+            writer.abort()
+        if zipped:
+            return None, "Job logs returned a zip archive; unable to parse."
+        error = (b"".join(stderr_chunks).decode(errors="replace") or scan.tail).strip()
+        return None, error or failure
+    if writer is not None:
+        writer.commit()
+    return scan, ""
+
+
+def scan_cached_log(repo_slug: str, kind: str, ident: str, max_lines: int, context: int) -> LogScan | None:
+    chunks = LOG_CACHE.open_chunks(repo_slug, kind, ident)
+    if chunks is None:
         return None
     try:
-        data = json.loads(result.stdout or "{}")
-    except json.JSONDecodeError:
-        return None
-    if not isinstance(data, dict):
-        return None
-    return data
+        scan = scan_log_lines(iter_text_lines(chunks), max_lines=max_lines, context=context)
+    except (OSError, EOFError, zlib.error):
+        return None  # truncated or corrupt entry; download again
+    return scan._replace(cached=True)
 
 
-def parse_parent_slug(repo_info: dict[str, Any]) -> str | None:
-    parent = repo_info.get("parent")
-    if not isinstance(parent, dict):
-        return None
-    name_with_owner = parent.get("nameWithOwner")
-    if name_with_owner:
-        return str(name_with_owner)
-    owner = parent.get("owner")
-    name = parent.get("name")
-    login = owner.get("login") if isinstance(owner, dict) else None
-    if login and name:
-        return f"{login}/{name}"
-    return None
-
-
-def current_branch(repo_root: Path) -> str | None:
-    result = subprocess.run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-        cwd=repo_root,
-        text=True,
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        return None
-    branch = result.stdout.strip()
-    if not branch or branch == "HEAD":
-        return None
-    return branch
+def tee_chunks(chunks: Iterable[bytes], sink: Callable[[bytes], None]) -> Iterator[bytes]:
+    for chunk in chunks:
+        sink(chunk)
+        yield chunk
 
 
 def parse_repo_from_pr_url(url: str) -> str | None:
@@ -675,36 +675,57 @@ def is_zip_payload(payload: bytes) -> bool:
     return payload.startswith(b"PK")
 
 
-def extract_failure_snippet(log_text: str, max_lines: int, context: int) -> str:
-    lines = log_text.splitlines()
-    if not lines:
-        return ""
-
-    marker_index = find_failure_index(lines)
-    if marker_index is None:
-        return "\n".join(lines[-max_lines:])
+def iter_text_lines(stream: Any) -> Iterator[str]:
+    # Chunks end at "\n", so splitting each one matches str.splitlines() on the whole log.
+    for chunk in stream:
+        yield from chunk.decode(errors="replace").splitlines()
 
-    start = max(0, marker_index - context)
-    end = min(len(lines), marker_index + context)
-    window = lines[start:end]
-    if len(window) > max_lines:
-        window = window[-max_lines:]
-    return "\n".join(window)
 
+def scan_log_lines(lines: Iterable[str], max_lines: int, context: int) -> LogScan:
+    """Single pass over a log keeping only bounded buffers.
 
-def find_failure_index(lines: Sequence[str]) -> int | None:
-    for idx in range(len(lines) - 1, -1, -1):
-        lowered = lines[idx].lower()
+    The snippet is the window around the last FAILURE_MARKERS hit (context lines
+    before, context - 1 after) trimmed to max_lines, or the tail when nothing matched.
+    """
+    tail: deque[str] = deque(maxlen=max_lines)
+    before: deque[str] = deque(maxlen=context)
+    window: list[str] | None = None
+    after_remaining = 0
+    for line in lines:
+        lowered = line.lower()
         if any(marker in lowered for marker in FAILURE_MARKERS):
-            return idx
-    return None
-
-
-def tail_lines(text: str, max_lines: int) -> str:
-    if max_lines <= 0:
-        return ""
-    lines = text.splitlines()
-    return "\n".join(lines[-max_lines:])
+            window = [*before, line]
+            after_remaining = context - 1
+        elif window is not None and after_remaining > 0:
+            window.append(line)
+            after_remaining -= 1
+        before.append(line)
+        tail.append(line)
+    tail_text = "\n".join(tail)
+    if window is None:
+        return LogScan(snippet=tail_text, tail=tail_text)
+    return LogScan(snippet="\n".join(window[-max_lines:]), tail=tail_text)
+
+
+class Memo:
+    """Compute each key once, even when several worker threads ask for it concurrently."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: dict[Any, Future[Any]] = {}
+
+    def get(self, key: Any, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if future is None:
+                future = self._futures[key] = Future()
+        if owner:
+            try:
+                future.set_result(compute())
+            except BaseException as exc:
+                future.set_exception(exc)
+        return future.result()
 
 
 def render_results(repo_slug: str, pr_number: str, results: Iterable[dict[str, Any]]) -> None:
@@ -739,6 +760,13 @@ def render_results(repo_slug: str, pr_number: str, results: Iterable[dict[str, A
         if result.get("note"):
             print(f"Note: {result['note']}")
 
+        for match in result.get("sameFailureAs") or []:
+            pr_label = f"PR #{match['pr']}" if match.get("pr") else "unknown PR"
+            print(
+                f"Same failure as: run {match['run_id']} ({pr_label}, check {match['check_name']}, "
+                f"recorded {match['recorded_at']})"
+            )
+
         if result.get("error"):
             print(f"Error fetching logs: {result['error']}")
             continue
@@ -13,10 +13,32 @@ import json
 import os
 import subprocess
 import sys
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
+
+COMMON_DIR = Path(__file__).resolve().parents[2] / "_common"
+if str(COMMON_DIR) not in sys.path:
+    sys.path.insert(0, str(COMMON_DIR))
+
+from gh_context import fetch_repo_slug
+from gh_http_cache import HttpStatusError, ResponseCache, conditional_get, gh_host
 
 Json = dict[str, Any]
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_JOBS = 8
+# GitHub's secondary rate limits punish bursts of concurrent requests per host.
+DEFAULT_MAX_PER_HOST = 6
+_host_limit = DEFAULT_MAX_PER_HOST
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+# REST GETs are revalidated with ETag/Last-Modified; a 304 costs no rate limit.
+HTTP_CACHE = ResponseCache()
 
 
 class GhError(RuntimeError):
@@ -31,24 +53,45 @@ class GhError(RuntimeError):
         return f"command failed: {' '.join(self.command)}\n{detail}"
 
 
-def gh(args: list[str], *, cwd: Path | None = None) -> str:
+def set_max_per_host(limit: int) -> None:
+    global _host_limit
+    with _host_slots_lock:
+        _host_limit = max(1, limit)
+        _host_slots.clear()
+
+
+@contextmanager
+def host_slot(host: str) -> Iterator[None]:
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(_host_limit)
+    with slot:
+        yield
+
+
+def run_gh(args: list[str], *, cwd: Path | None = None) -> tuple[int, bytes, str]:
     env = os.environ.copy()
     env.setdefault("GH_FORCE_TTY", "0")
     env.setdefault("GH_PAGER", "cat")
     env.setdefault("GIT_TERMINAL_PROMPT", "0")
-    command = ["gh", *args]
-    result = subprocess.run(
-        command,
-        cwd=str(cwd) if cwd else None,
-        env=env,
-        text=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        check=False,
-    )
-    if result.returncode != 0:
-        raise GhError(command, result.stderr, result.stdout)
-    return result.stdout
+    with host_slot(gh_host()):
+        result = subprocess.run(
+            ["gh", *args],
+            cwd=str(cwd) if cwd else None,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+    return result.returncode, result.stdout, result.stderr.decode(errors="replace")
+
+
+def gh(args: list[str], *, cwd: Path | None = None) -> str:
+    returncode, stdout, stderr = run_gh(args, cwd=cwd)
+    if returncode != 0:
+        raise GhError(["gh", *args], stderr, stdout.decode(errors="replace"))
+    return stdout.decode(errors="replace")
 
 
 def gh_json(args: list[str], *, cwd: Path | None = None) -> Any:
@@ -59,11 +102,14 @@ def gh_json(args: list[str], *, cwd: Path | None = None) -> Any:
 
 
 def gh_api(path: str, *, paginate: bool = False) -> Any:
-    args = ["api"]
-    if paginate:
-        args.extend(["--paginate", "--slurp"])
-    args.append(path)
-    return gh_json(args)
+    try:
+        body = conditional_get(HTTP_CACHE, path, run_gh, paginate=paginate)
+    except HttpStatusError as exc:
+        raise GhError(["gh", "api", path], exc.stderr, exc.body.decode(errors="replace")) from None
+    output = body.decode(errors="replace").strip()
+    if not output:
+        return None
+    return json.loads(output)
 
 
 def flatten_pages(value: Any) -> list[Any]:
@@ -90,11 +136,10 @@ def parse_repo(repo: str) -> tuple[str, str]:
 
 
 def detect_repo(cwd: Path) -> str:
-    data = gh_json(["repo", "view", "--json", "nameWithOwner"], cwd=cwd)
-    repo = data.get("nameWithOwner") if isinstance(data, dict) else None
+    repo = fetch_repo_slug(cwd)
     if not repo:
         raise RuntimeError("failed to detect GitHub repository via gh repo view")
-    return str(repo)
+    return repo
 
 
 def git_status(cwd: Path) -> dict[str, str]:
@@ -257,6 +302,321 @@ def collect_pr(repo: str, owner: str, name: str, pr: Json) -> Json:
     }
 
 
+PR_BATCH_QUERY = """
+query($owner: String!, $name: String!, $n: Int!, $cursor: String) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: OPEN, first: $n, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        url
+        isDraft
+        headRefName
+        headRefOid
+        baseRefName
+        reviewDecision
+        mergeStateStatus
+        updatedAt
+        closingIssuesReferences(first: 20) { nodes { number url } }
+        latestReviews(first: 50) { nodes { author { login } state submittedAt } }
+        reviewRequests(first: 50) {
+          nodes { requestedReviewer { __typename ... on User { login } ... on Team { name } } }
+        }
+        headCommit: commits(last: 1) {
+          nodes {
+            commit {
+              statusCheckRollup {
+                state
+                contexts(first: 100) {
+                  pageInfo { hasNextPage }
+                  nodes {
+                    __typename
+                    ... on CheckRun { name status conclusion detailsUrl startedAt completedAt }
+                    ... on StatusContext { context state targetUrl description }
+                  }
+                }
+              }
+            }
+          }
+        }
+        comments(first: 100) {
+          pageInfo { hasNextPage }
+          nodes { author { login } body createdAt url }
+        }
+        reviews(first: 100) {
+          pageInfo { hasNextPage }
+          nodes { author { login } body state submittedAt url commit { oid } }
+        }
+        commits(first: 100) {
+          pageInfo { hasNextPage }
+          nodes { commit { oid messageHeadline authoredDate } }
+        }
+        reviewThreads(first: 100) {
+          pageInfo { hasNextPage }
+          nodes {
+            id
+            isResolved
+            isOutdated
+            path
+            line
+            startLine
+            comments(first: 50) {
+              pageInfo { hasNextPage }
+              nodes { author { login } body createdAt url }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+ISSUE_BATCH_QUERY = """
+query($owner: String!, $name: String!, $n: Int!, $cursor: String) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    issues(states: OPEN, first: $n, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        url
+        createdAt
+        updatedAt
+        author { login }
+        labels(first: 50) { nodes { name } }
+        assignees(first: 20) { nodes { login } }
+        comments(first: 100) {
+          pageInfo { hasNextPage }
+          nodes { author { login } body createdAt url }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def gh_graphql(query: str, variables: dict[str, Any]) -> tuple[Json, list[Json]]:
+    """Run a GraphQL query, keeping partial data when GitHub reports errors."""
+    args = ["api", "graphql", "-f", f"query={query}"]
+    for key, value in variables.items():
+        if value is None:
+            continue
+        args.extend(["-F" if isinstance(value, int) else "-f", f"{key}={value}"])
+    try:
+        response = gh_json(args)
+    except GhError as exc:
+        # gh exits non-zero on GraphQL errors but still prints the partial response.
+        try:
+            response = json.loads(exc.stdout) if exc.stdout else None
+        except json.JSONDecodeError:
+            response = None
+        if not isinstance(response, dict) or not response.get("data"):
+            raise
+    errors = response.get("errors") or []
+    return response.get("data") or {}, [error for error in errors if isinstance(error, dict)]
+
+
+def nodes(connection: Any) -> list[Any]:
+    if not isinstance(connection, dict):
+        return []
+    return [node for node in connection.get("nodes") or [] if node is not None]
+
+
+def truncated(connection: Any) -> bool:
+    return isinstance(connection, dict) and bool((connection.get("pageInfo") or {}).get("hasNextPage"))
+
+
+def rest_user(node: Json) -> Json | None:
+    author = node.get("author")
+    return {"login": author.get("login")} if isinstance(author, dict) else None
+
+
+def rest_comment(node: Json) -> Json:
+    return {
+        "user": rest_user(node),
+        "body": node.get("body"),
+        "created_at": node.get("createdAt"),
+        "html_url": node.get("url"),
+    }
+
+
+def pr_from_graphql(node: Json) -> tuple[Json, bool]:
+    """Map one batched PR node onto the REST-shaped record; the flag is True when a connection was cut off."""
+    rollup = None
+    head_nodes = nodes(node.get("headCommit"))
+    if head_nodes:
+        rollup = (head_nodes[0].get("commit") or {}).get("statusCheckRollup")
+    contexts = nodes((rollup or {}).get("contexts"))
+    threads = nodes(node.get("reviewThreads"))
+    is_truncated = any(
+        truncated(connection)
+        for connection in [
+            node.get("comments"),
+            node.get("reviews"),
+            node.get("commits"),
+            node.get("reviewThreads"),
+            (rollup or {}).get("contexts"),
+            *(thread.get("comments") for thread in threads),
+        ]
+    )
+    detail = {
+        "number": node.get("number"),
+        "title": node.get("title"),
+        "body": node.get("body"),
+        "html_url": node.get("url"),
+        "draft": node.get("isDraft"),
+        "updated_at": node.get("updatedAt"),
+        "head": {"ref": node.get("headRefName"), "sha": node.get("headRefOid")},
+        "base": {"ref": node.get("baseRefName")},
+    }
+    gh_pr_view = {
+        "number": node.get("number"),
+        "title": node.get("title"),
+        "url": node.get("url"),
+        "isDraft": node.get("isDraft"),
+        "headRefName": node.get("headRefName"),
+        "baseRefName": node.get("baseRefName"),
+        "reviewDecision": node.get("reviewDecision"),
+        "mergeStateStatus": node.get("mergeStateStatus"),
+        "statusCheckRollup": contexts,
+        "closingIssuesReferences": nodes(node.get("closingIssuesReferences")),
+        "latestReviews": nodes(node.get("latestReviews")),
+        "reviewRequests": [item.get("requestedReviewer") for item in nodes(node.get("reviewRequests"))],
+        "updatedAt": node.get("updatedAt"),
+    }
+    statuses = [item for item in contexts if item.get("__typename") == "StatusContext"]
+    record = {
+        "pull_request": detail,
+        "detail": detail,
+        "gh_pr_view": gh_pr_view,
+        "issue_comments": [rest_comment(comment) for comment in nodes(node.get("comments"))],
+        "reviews": [
+            {
+                **rest_comment(review),
+                "state": review.get("state"),
+                "submitted_at": review.get("submittedAt"),
+                "commit_id": (review.get("commit") or {}).get("oid"),
+            }
+            for review in nodes(node.get("reviews"))
+        ],
+        "review_comments": [
+            {**rest_comment(comment), "path": thread.get("path"), "line": thread.get("line")}
+            for thread in threads
+            for comment in nodes(thread.get("comments"))
+        ],
+        "commits": [
+            {
+                "sha": (item.get("commit") or {}).get("oid"),
+                "commit": {"message": (item.get("commit") or {}).get("messageHeadline")},
+            }
+            for item in nodes(node.get("commits"))
+        ],
+        "combined_status": {
+            "state": str((rollup or {}).get("state") or "unknown").lower(),
+            "statuses": [
+                {
+                    "context": item.get("context"),
+                    "state": str(item.get("state") or "").lower(),
+                    "target_url": item.get("targetUrl"),
+                    "description": item.get("description"),
+                }
+                for item in statuses
+            ],
+        },
+        "check_runs": [
+            {
+                "name": item.get("name"),
+                "status": str(item.get("status") or "").lower(),
+                "conclusion": str(item.get("conclusion") or "").lower() or None,
+                "html_url": item.get("detailsUrl"),
+                "started_at": item.get("startedAt"),
+                "completed_at": item.get("completedAt"),
+            }
+            for item in contexts
+            if item.get("__typename") == "CheckRun"
+        ],
+        "review_threads": {"threads": threads},
+    }
+    return record, is_truncated
+
+
+def issue_from_graphql(node: Json) -> tuple[Json, bool]:
+    issue = {
+        "number": node.get("number"),
+        "title": node.get("title"),
+        "body": node.get("body"),
+        "html_url": node.get("url"),
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "user": rest_user(node),
+        "labels": nodes(node.get("labels")),
+        "assignees": nodes(node.get("assignees")),
+    }
+    comments = [rest_comment(comment) for comment in nodes(node.get("comments"))]
+    return {"issue": issue, "comments": comments}, truncated(node.get("comments"))
+
+
+def errored_indexes(errors: list[Json], connection: str) -> set[int] | None:
+    """Node indexes named by GraphQL error paths, or None when an error cannot be pinned to a node."""
+    indexes: set[int] = set()
+    for error in errors:
+        path = error.get("path") or []
+        if connection not in path:
+            return None
+        position = path.index(connection)
+        if len(path) > position + 2 and path[position + 1] == "nodes" and isinstance(path[position + 2], int):
+            indexes.add(path[position + 2])
+        else:
+            return None
+    return indexes
+
+
+def collect_batched(
+    owner: str,
+    name: str,
+    *,
+    query: str,
+    connection: str,
+    batch_size: int,
+    convert: Callable[[Json], tuple[Json, bool]],
+    stats: Json,
+) -> list[tuple[Json, bool]]:
+    """Page a repository connection into (record, needs_rest) pairs in listing order."""
+    items: list[tuple[Json, bool]] = []
+    cursor = None
+    while True:
+        data, errors = gh_graphql(query, {"owner": owner, "name": name, "n": batch_size, "cursor": cursor})
+        stats["queries"] += 1
+        rate_limit = data.get("rateLimit") or {}
+        stats["cost"] += int(rate_limit.get("cost") or 0)
+        if rate_limit.get("remaining") is not None:
+            stats["remaining"] = rate_limit["remaining"]
+        page = (data.get("repository") or {}).get(connection)
+        if not isinstance(page, dict):
+            raise RuntimeError(f"{connection} missing from GraphQL response: {errors or 'no data'}")
+        bad = errored_indexes(errors, connection)
+        if bad is None:
+            raise RuntimeError(f"unattributable GraphQL errors: {errors}")
+        for index, node in enumerate(page.get("nodes") or []):
+            if not isinstance(node, dict) or node.get("number") is None:
+                raise RuntimeError(f"{connection} node {index} missing from GraphQL response")
+            record, is_truncated = convert(node)
+            items.append((record, index in bad or is_truncated))
+        page_info = page.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return items
+        cursor = page_info.get("endCursor")
+        if not cursor:
+            raise RuntimeError("missing GraphQL endCursor")
+
+
 def labels(item: Json) -> str:
     raw_labels = item.get("labels") or []
     names = [str(label.get("name")) for label in raw_labels if isinstance(label, dict) and label.get("name")]
@@ -347,6 +707,38 @@ def render_markdown(snapshot: Json) -> str:
         f"- Open issues: {len(snapshot['issues'])}",
         f"- Open PRs: {len(snapshot['pull_requests'])}",
         f"- Collector errors: {len(snapshot['errors'])}",
+    ]
+    http_cache = snapshot.get("http_cache")
+    if http_cache:
+        lines.append(
+            f"- HTTP cache: {http_cache['not_modified']} not modified, {http_cache['fresh']} replayed, "
+            f"{http_cache['miss']} fetched"
+        )
+    batch = snapshot.get("graphql_batch")
+    if batch:
+        summary = f"- GraphQL batch: {batch['queries']} queries, cost {batch['cost']}"
+        if batch.get("remaining") is not None:
+            summary += f", {batch['remaining']} points remaining"
+        summary += f", {len(batch['rest_refetched'])} items refetched via REST"
+        if batch.get("fallback"):
+            summary += f"; fell back to {md_escape(batch['fallback'])}"
+        lines.append(summary)
+    incremental = snapshot.get("incremental")
+    if incremental:
+        lines.extend([
+            "",
+            f"## Changes since previous snapshot (`{incremental['previous_captured_at']}`)",
+            "",
+        ])
+        for label, key in (
+            ("New", "new"),
+            ("Updated", "updated"),
+            ("Checks re-read (were pending)", "rechecked"),
+            ("Closed or merged", "closed"),
+        ):
+            lines.append(f"- {label}: {', '.join(incremental[key]) or 'none'}")
+        lines.append(f"- Carried forward unchanged: {incremental['carried_forward']}")
+    lines += [
         "",
         "## Open pull requests",
         "",
@@ -427,8 +819,103 @@ def render_markdown(snapshot: Json) -> str:
     return "\n".join(lines) + "\n"
 
 
-def collect_snapshot(repo: str, cwd: Path) -> Json:
+def collect_each(
+    items: Iterable[T], collect: Callable[[T], R], *, jobs: int
+) -> list[tuple[T, R | None, Exception | None]]:
+    """Run `collect` over items concurrently, returning (item, result, error) in input order."""
+
+    def attempt(item: T) -> tuple[T, R | None, Exception | None]:
+        try:
+            return item, collect(item), None
+        except Exception as exc:  # noqa: BLE001 - callers record per-item errors.
+            return item, None, exc
+
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        return [attempt(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        return list(pool.map(attempt, items))
+
+
+def collect_snapshot(repo: str, cwd: Path, *, jobs: int = DEFAULT_JOBS) -> Json:
     owner, name = parse_repo(repo)
+    errors: list[Json] = []
+    repo_info: Json = {}
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        repo_info_future = pool.submit(gh_api, f"/repos/{repo}")
+        issues_future = pool.submit(gh_api, f"/repos/{repo}/issues?state=open&per_page=100", paginate=True)
+        pulls_future = pool.submit(gh_api, f"/repos/{repo}/pulls?state=open&per_page=100", paginate=True)
+        try:
+            repo_info = repo_info_future.result()
+        except Exception as exc:  # noqa: BLE001 - preserve partial snapshot.
+            errors.append({"scope": "repo_info", "error": str(exc)})
+        raw_issues = flatten_pages(issues_future.result())
+        pulls = flatten_pages(pulls_future.result())
+    issues = [item for item in raw_issues if isinstance(item, dict) and "pull_request" not in item]
+
+    # Issues and PRs share one pool so slow PRs overlap with issue comment fetches;
+    # results and errors are still reported in listing order.
+    tasks: list[tuple[str, Json]] = [("issue", issue) for issue in issues] + [("pr", pr) for pr in pulls]
+
+    def collect_item(task: tuple[str, Json]) -> Json:
+        kind, item = task
+        if kind == "issue":
+            return collect_issue(repo, item)
+        return collect_pr(repo, owner, name, item)
+
+    collected_issues: list[Json] = []
+    collected_prs: list[Json] = []
+    for (kind, item), result, exc in collect_each(tasks, collect_item, jobs=jobs):
+        if kind == "issue":
+            if exc is not None:
+                errors.append({"scope": f"issue#{item.get('number')}", "error": str(exc)})
+                result = {"issue": item, "comments": []}
+            collected_issues.append(result)
+        else:
+            if exc is not None:
+                errors.append({"scope": f"pr#{item.get('number')}", "error": str(exc)})
+                result = {"pull_request": item}
+            collected_prs.append(result)
+
+    return {
+        "captured_at": dt.datetime.now(dt.UTC).isoformat(),
+        "repo": repo,
+        "repo_info": repo_info,
+        "git": git_status(cwd),
+        "issues": collected_issues,
+        "pull_requests": collected_prs,
+        "errors": errors,
+        "http_cache": dict(HTTP_CACHE.stats),
+    }
+
+
+def collect_snapshot_graphql(repo: str, cwd: Path, *, jobs: int, batch_size: int) -> Json:
+    owner, name = parse_repo(repo)
+    stats: Json = {"batch_size": batch_size, "queries": 0, "cost": 0, "remaining": None, "rest_refetched": []}
+    try:
+        pr_items = collect_batched(
+            owner,
+            name,
+            query=PR_BATCH_QUERY,
+            connection="pullRequests",
+            batch_size=batch_size,
+            convert=pr_from_graphql,
+            stats=stats,
+        )
+        issue_items = collect_batched(
+            owner,
+            name,
+            query=ISSUE_BATCH_QUERY,
+            connection="issues",
+            batch_size=batch_size,
+            convert=issue_from_graphql,
+            stats=stats,
+        )
+    except Exception as exc:  # noqa: BLE001 - the REST collector is the complete fallback.
+        snapshot = collect_snapshot(repo, cwd, jobs=jobs)
+        snapshot["graphql_batch"] = {**stats, "fallback": f"REST snapshot: {exc}"}
+        return snapshot
+
     errors: list[Json] = []
     repo_info: Json = {}
     try:
@@ -436,26 +923,167 @@ def collect_snapshot(repo: str, cwd: Path) -> Json:
     except Exception as exc:  # noqa: BLE001 - preserve partial snapshot.
         errors.append({"scope": "repo_info", "error": str(exc)})
 
-    raw_issues = flatten_pages(gh_api(f"/repos/{repo}/issues?state=open&per_page=100", paginate=True))
-    issues = [item for item in raw_issues if isinstance(item, dict) and "pull_request" not in item]
-    pulls = flatten_pages(gh_api(f"/repos/{repo}/pulls?state=open&per_page=100", paginate=True))
+    # Items GraphQL could not return in full (field errors or connections past their
+    # first page) are re-collected through the per-item REST path.
+    tasks: list[tuple[str, Json]] = [("issue", record["issue"]) for record, needs_rest in issue_items if needs_rest]
+    tasks += [("pr", record["pull_request"]) for record, needs_rest in pr_items if needs_rest]
+
+    def collect_item(task: tuple[str, Json]) -> Json:
+        kind, item = task
+        if kind == "issue":
+            return collect_issue(repo, item)
+        return collect_pr(repo, owner, name, item)
+
+    refetched: dict[tuple[str, int], Json] = {}
+    for (kind, item), result, exc in collect_each(tasks, collect_item, jobs=jobs):
+        stats["rest_refetched"].append(f"{kind}#{item.get('number')}")
+        if exc is not None:
+            errors.append({"scope": f"{kind}#{item.get('number')}", "error": str(exc)})
+            result = {"issue": item, "comments": []} if kind == "issue" else {"pull_request": item}
+        refetched[(kind, item["number"])] = result
 
-    collected_issues: list[Json] = []
-    for issue in issues:
-        try:
-            collected_issues.append(collect_issue(repo, issue))
-        except Exception as exc:  # noqa: BLE001
-            errors.append({"scope": f"issue#{issue.get('number')}", "error": str(exc)})
-            collected_issues.append({"issue": issue, "comments": []})
+    return {
+        "captured_at": dt.datetime.now(dt.UTC).isoformat(),
+        "repo": repo,
+        "repo_info": repo_info,
+        "git": git_status(cwd),
+        "issues": [refetched.get(("issue", record["issue"]["number"]), record) for record, _ in issue_items],
+        "pull_requests": [refetched.get(("pr", record["detail"]["number"]), record) for record, _ in pr_items],
+        "errors": errors,
+        "graphql_batch": stats,
+        "http_cache": dict(HTTP_CACHE.stats),
+    }
 
-    collected_prs: list[Json] = []
-    for pr in pulls:
+
+# Listing `since=` is applied this far before the previous capture to absorb clock skew.
+WATERMARK_SLACK = dt.timedelta(minutes=5)
+
+
+def pr_number(pr_data: Json) -> int | None:
+    return (pr_data.get("detail") or pr_data.get("pull_request") or {}).get("number")
+
+
+def pr_fingerprint(pr_data: Json) -> tuple[Any, Any]:
+    pr = pr_data.get("detail") or pr_data.get("pull_request") or {}
+    return pr.get("updated_at"), (pr.get("head") or {}).get("sha")
+
+
+def snapshot_shape_error(previous: Any) -> str | None:
+    """Why `previous` cannot seed an incremental run, or None if it looks like a snapshot."""
+    if not isinstance(previous, dict):
+        return "not a JSON object"
+    try:
+        dt.datetime.fromisoformat(str(previous["captured_at"]))
+    except KeyError:
+        return "missing captured_at"
+    except ValueError:
+        return f"invalid captured_at {previous['captured_at']!r}"
+    for key in ("issues", "pull_requests", "errors"):
+        items = previous.get(key)
+        if items is None:
+            continue
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return f"{key} is not a list of objects"
+    return None
+
+
+def collect_snapshot_incremental(repo: str, cwd: Path, previous: Json, *, jobs: int) -> Json:
+    """Re-collect only items that moved since `previous`; carry the rest forward unchanged.
+
+    Open PRs are listed in full (the listing carries updated_at and head SHA, and absence
+    means closed). Issues come from one `state=all&since=` listing, so unchanged issues cost nothing.
+    """
+    owner, name = parse_repo(repo)
+    captured = dt.datetime.fromisoformat(previous["captured_at"])
+    watermark = (captured - WATERMARK_SLACK).strftime("%Y-%m-%dT%H:%M:%SZ")
+    errors: list[Json] = []
+    repo_info: Json = {}
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        repo_info_future = pool.submit(gh_api, f"/repos/{repo}")
+        changed_future = pool.submit(
+            gh_api, f"/repos/{repo}/issues?state=all&since={watermark}&per_page=100", paginate=True
+        )
+        pulls_future = pool.submit(gh_api, f"/repos/{repo}/pulls?state=open&per_page=100", paginate=True)
         try:
-            collected_prs.append(collect_pr(repo, owner, name, pr))
-        except Exception as exc:  # noqa: BLE001
-            errors.append({"scope": f"pr#{pr.get('number')}", "error": str(exc)})
-            collected_prs.append({"pull_request": pr})
+            repo_info = repo_info_future.result()
+        except Exception as exc:  # noqa: BLE001 - preserve partial snapshot.
+            errors.append({"scope": "repo_info", "error": str(exc)})
+        changed = [
+            item
+            for item in flatten_pages(changed_future.result())
+            if isinstance(item, dict) and "pull_request" not in item
+        ]
+        pulls = flatten_pages(pulls_future.result())
 
+    # Items that failed last time are always retried; PRs with pending checks are re-read
+    # because CI finishing does not bump updated_at.
+    retry = {str(error.get("scope")) for error in previous.get("errors") or []}
+    previous_issues = {
+        item["issue"]["number"]: item for item in previous.get("issues") or [] if (item.get("issue") or {}).get("number")
+    }
+    previous_prs = {pr_number(item): item for item in previous.get("pull_requests") or [] if pr_number(item)}
+
+    issue_order = dict.fromkeys(previous_issues)
+    tasks: list[tuple[str, Json]] = []
+    changes: Json = {"new": [], "updated": [], "closed": [], "rechecked": [], "carried_forward": 0}
+    for issue in changed:
+        number = issue["number"]
+        if issue.get("state") != "open":
+            if number in previous_issues:
+                changes["closed"].append(f"issue#{number}")
+                issue_order.pop(number, None)
+            continue
+        previous_issue = previous_issues.get(number)
+        if previous_issue is not None and previous_issue["issue"].get("updated_at") == issue.get("updated_at"):
+            continue
+        changes["new" if previous_issue is None else "updated"].append(f"issue#{number}")
+        issue_order[number] = None
+        tasks.append(("issue", issue))
+    pending_issue_numbers = {item["number"] for kind, item in tasks}
+    for number in issue_order:
+        if number not in pending_issue_numbers and f"issue#{number}" in retry:
+            changes["updated"].append(f"issue#{number}")
+            tasks.append(("issue", previous_issues[number]["issue"]))
+
+    open_prs = {pr.get("number") for pr in pulls if isinstance(pr, dict)}
+    changes["closed"] += [f"pr#{number}" for number in previous_prs if number not in open_prs]
+    for pr in pulls:
+        number = pr.get("number")
+        previous_pr = previous_prs.get(number)
+        scope = f"pr#{number}"
+        if previous_pr is None:
+            changes["new"].append(scope)
+        elif scope in retry or pr_fingerprint(previous_pr) != (pr.get("updated_at"), (pr.get("head") or {}).get("sha")):
+            changes["updated"].append(scope)
+        elif check_state(previous_pr) == "pending":
+            changes["rechecked"].append(scope)
+        else:
+            continue
+        tasks.append(("pr", pr))
+
+    def collect_item(task: tuple[str, Json]) -> Json:
+        kind, item = task
+        if kind == "issue":
+            return collect_issue(repo, item)
+        return collect_pr(repo, owner, name, item)
+
+    refreshed: dict[tuple[str, int], Json] = {}
+    for (kind, item), result, exc in collect_each(tasks, collect_item, jobs=jobs):
+        if exc is not None:
+            errors.append({"scope": f"{kind}#{item.get('number')}", "error": str(exc)})
+            result = {"issue": item, "comments": []} if kind == "issue" else {"pull_request": item}
+        refreshed[(kind, item["number"])] = result
+
+    collected_issues = [
+        refreshed.get(("issue", number)) or previous_issues[number]
+        for number in sorted(issue_order, reverse=True)
+    ]
+    collected_prs = [
+        refreshed.get(("pr", pr.get("number"))) or previous_prs[pr.get("number")]
+        for pr in pulls
+        if isinstance(pr, dict)
+    ]
+    changes["carried_forward"] = len(collected_issues) + len(collected_prs) - len(refreshed)
     return {
         "captured_at": dt.datetime.now(dt.UTC).isoformat(),
         "repo": repo,
@@ -464,6 +1092,8 @@ def collect_snapshot(repo: str, cwd: Path) -> Json:
         "issues": collected_issues,
         "pull_requests": collected_prs,
         "errors": errors,
+        "http_cache": dict(HTTP_CACHE.stats),
+        "incremental": {"previous_captured_at": previous["captured_at"], "watermark": watermark, **changes},
     }
 
 
@@ -472,7 +1102,31 @@ def main() -> int:
     parser.add_argument("--repo", help="GitHub repository in owner/name form. Defaults to gh repo view.")
     parser.add_argument("--out", default=".codex_tmp/open-work-state", help="Output directory.")
     parser.add_argument("--cwd", default=".", help="Repository root used for gh/git detection.")
+    parser.add_argument(
+        "--jobs", type=int, default=DEFAULT_JOBS, help="Issues/PRs collected concurrently (1 = serial)."
+    )
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=DEFAULT_MAX_PER_HOST,
+        help="Maximum concurrent gh calls against one GitHub host.",
+    )
+    parser.add_argument(
+        "--graphql-batch",
+        action="store_true",
+        help="Fetch open PRs and issues through paged GraphQL queries, falling back to REST per item.",
+    )
+    parser.add_argument("--batch-size", type=int, default=10, help="PRs/issues per GraphQL query.")
+    parser.add_argument(
+        "--since-snapshot",
+        type=Path,
+        default=None,
+        help="Previous open-work-state.json; only issues/PRs that changed since it are re-collected.",
+    )
     args = parser.parse_args()
+    if args.since_snapshot is not None and args.graphql_batch:
+        parser.error("--since-snapshot and --graphql-batch are mutually exclusive")
+    set_max_per_host(args.max_per_host)
 
     cwd = Path(args.cwd).resolve()
     repo = args.repo or detect_repo(cwd)
@@ -481,7 +1135,26 @@ def main() -> int:
         out_dir = cwd / out_dir
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    snapshot = collect_snapshot(repo, cwd)
+    previous = None
+    if args.since_snapshot is not None:
+        try:
+            previous = json.loads(args.since_snapshot.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"ignoring --since-snapshot {args.since_snapshot}: {exc}", file=sys.stderr)
+        shape_error = snapshot_shape_error(previous) if previous is not None else None
+        if shape_error is not None:
+            print(f"ignoring --since-snapshot {args.since_snapshot}: {shape_error}", file=sys.stderr)
+            previous = None
+        if previous is not None and previous.get("repo") != repo:
+            print(f"ignoring --since-snapshot {args.since_snapshot}: snapshot is for {previous.get('repo')}", file=sys.stderr)
+            previous = None
+
+    if previous is not None:
+        snapshot = collect_snapshot_incremental(repo, cwd, previous, jobs=args.jobs)
+    elif args.graphql_batch:
+        snapshot = collect_snapshot_graphql(repo, cwd, jobs=args.jobs, batch_size=args.batch_size)
+    else:
+        snapshot = collect_snapshot(repo, cwd, jobs=args.jobs)
     json_path = out_dir / "open-work-state.json"
     md_path = out_dir / "open-work-state.md"
     json_path.write_text(json.dumps(snapshot, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
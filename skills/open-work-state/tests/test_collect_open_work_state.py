@@ -0,0 +1,227 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parents[1]
+COLLECTOR = SKILL_DIR / "scripts" / "collect_open_work_state.py"
+
+# Fake `gh`: answers REST/GraphQL calls from canned data, fails for PR #3's detail,
+# honours If-None-Match with a 304, and records the peak number of concurrent invocations.
+FAKE_GH = r'''#!/usr/bin/env python3
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+
+state = Path(os.environ["FAKE_GH_STATE"])
+active = state / "active"
+active.mkdir(exist_ok=True)
+marker = active / str(os.getpid())
+marker.touch()
+try:
+    running = len(list(active.iterdir()))
+    with (state / "peaks").open("a") as handle:
+        handle.write(f"{running}\n")
+    time.sleep(0.05)
+    args = sys.argv[1:]
+    query = next((arg[6:] for arg in args if arg.startswith("query=")), "")
+    fields = dict(arg.split("=", 1) for arg in args if arg.startswith(("n=", "cursor=")))
+    if "pullRequests(states: OPEN" in query or "issues(states: OPEN" in query:
+        numbers = [1, 2, 3, 4, 5] if "pullRequests" in query else [10, 11, 12]
+        start = int(fields.get("cursor", "0"))
+        page = numbers[start:start + int(fields["n"])]
+        empty = {"pageInfo": {"hasNextPage": False}, "nodes": []}
+        nodes = [{
+            "number": n, "title": f"#{n}", "url": f"https://github.com/acme/widgets/pull/{n}",
+            "headRefOid": f"sha{n}", "headRefName": f"b{n}", "baseRefName": "main",
+            "labels": empty, "assignees": empty, "reviews": empty, "commits": empty, "reviewThreads": empty,
+            "comments": {"pageInfo": {"hasNextPage": n == 4}, "nodes": [{"author": {"login": "a"}, "body": "hi"}]},
+        } for n in page]
+        errors = []
+        if 3 in page:
+            nodes[page.index(3)]["reviews"] = None
+            errors.append({"path": ["repository", "pullRequests", "nodes", page.index(3), "reviews"]})
+        connection = "pullRequests" if "pullRequests" in query else "issues"
+        end = start + len(page)
+        print(json.dumps({"errors": errors, "data": {
+            "rateLimit": {"cost": 1, "remaining": 4990},
+            "repository": {connection: {
+                "pageInfo": {"hasNextPage": end < len(numbers), "endCursor": str(end)}, "nodes": nodes}}}}))
+        sys.exit(1 if errors else 0)
+    if args[:2] == ["api", "graphql"]:
+        print(json.dumps({"data": {"repository": {"pullRequest": {
+            "reviewThreads": {"nodes": [], "pageInfo": {"hasNextPage": False}}}}}}))
+        sys.exit(0)
+    if args[0] == "pr":
+        print(json.dumps({"number": int(args[2]), "title": f"PR {args[2]}"}))
+        sys.exit(0)
+    path = args[-1].split("?")[0]
+    parts = path.strip("/").split("/")
+    with (state / "calls").open("a") as handle:
+        handle.write(f"{args[-1]}\n")
+    updated = {int(n) for n in os.environ.get("FAKE_GH_UPDATED", "").split(",") if n}
+    closed = {int(n) for n in os.environ.get("FAKE_GH_CLOSED", "").split(",") if n}
+
+    def item(n):
+        stamp = "2026-02-01T00:00:00Z" if n in updated else "2026-01-01T00:00:00Z"
+        return {"number": n, "state": "closed" if n in closed else "open", "updated_at": stamp}
+
+    status = 200
+    if path == "/repos/acme/widgets":
+        body = {"html_url": "https://github.com/acme/widgets"}
+    elif path.endswith("/issues") and len(parts) == 4:
+        body = [{**item(n), "title": f"Issue {n}"} for n in (13, 12, 11, 10) if n != 13 or 13 in updated]
+        body = [issue for issue in body if issue["state"] == "open" or "state=all" in args[-1]]
+        body.append({"number": 1, "pull_request": {}})
+    elif path.endswith("/pulls") and len(parts) == 4:
+        body = [{**item(n), "head": {"sha": f"sha{n}"}} for n in (1, 2, 3, 4, 5) if n not in closed]
+    elif parts[3] == "pulls" and len(parts) == 5:
+        status = 502 if parts[4] == "3" else 200
+        body = {**item(int(parts[4])), "head": {"sha": f"sha{parts[4]}"}}
+    elif parts[-1] == "status":
+        body = {"state": "success"}
+    elif parts[-1] == "check-runs":
+        body = {"check_runs": []}
+    else:
+        body = []
+    text = json.dumps(body)
+    etag = f'"{zlib.crc32(text.encode())}"'
+    headers = [arg[len("If-None-Match: "):] for arg in args if arg.startswith("If-None-Match: ")]
+    if status == 502:
+        print("HTTP/2.0 502 Bad Gateway\r\n\r\n", end="")
+        print("HTTP 502: upstream exploded", file=sys.stderr)
+        sys.exit(1)
+    if headers and headers[0] == etag:
+        with (state / "not_modified").open("a") as handle:
+            handle.write(f"{path}\n")
+        print(f"HTTP/2.0 304 Not Modified\r\nEtag: {etag}\r\n\r\n", end="")
+        print("gh: HTTP 304", file=sys.stderr)
+        sys.exit(1)
+    print(f"HTTP/2.0 200 OK\r\nEtag: {etag}\r\nContent-Type: application/json\r\n\r\n{text}")
+finally:
+    marker.unlink()
+'''
+
+
+class CollectOpenWorkStateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.root = Path(temporary_directory.name)
+        fake_gh = self.root / "bin" / "gh"
+        fake_gh.parent.mkdir()
+        fake_gh.write_text(FAKE_GH)
+        fake_gh.chmod(0o755)
+
+    def run_collector(self, *extra: str, **fake_env: str) -> tuple[int, dict, list[int]]:
+        root = self.root
+        state = root / f"state{len(list(root.glob('state*')))}"
+        state.mkdir()
+        env = {
+            **os.environ,
+            **fake_env,
+            "PATH": f"{root / 'bin'}{os.pathsep}{os.environ['PATH']}",
+            "FAKE_GH_STATE": str(state),
+            "CODEX_HOME": str(root / "codex-home"),
+        }
+        result = subprocess.run(
+            [sys.executable, str(COLLECTOR), "--repo", "acme/widgets", "--out", str(state / "out"), *extra],
+            cwd=root,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        snapshot = json.loads((state / "out" / "open-work-state.json").read_text())
+        peaks = [int(line) for line in (state / "peaks").read_text().split()]
+        return result.returncode, snapshot, peaks
+
+    def test_concurrent_snapshot_matches_serial_order_and_errors(self) -> None:
+        serial_code, serial, _ = self.run_collector("--jobs", "1")
+        code, snapshot, peaks = self.run_collector("--jobs", "8", "--max-per-host", "3")
+
+        self.assertEqual(code, 2)
+        self.assertEqual(serial_code, 2)
+        self.assertEqual([item["issue"]["number"] for item in snapshot["issues"]], [12, 11, 10])
+        self.assertEqual(
+            [(item.get("detail") or item["pull_request"])["number"] for item in snapshot["pull_requests"]],
+            [1, 2, 3, 4, 5],
+        )
+        self.assertEqual(list(snapshot["pull_requests"][2]), ["pull_request"])
+        self.assertEqual([error["scope"] for error in snapshot["errors"]], ["pr#3"])
+        self.assertIn("upstream exploded", snapshot["errors"][0]["error"])
+        for key in ("issues", "pull_requests", "errors", "repo_info"):
+            self.assertEqual(snapshot[key], serial[key])
+        self.assertLessEqual(max(peaks), 3)
+        self.assertGreater(max(peaks), 1)
+
+    def test_graphql_batch_refetches_partial_items_through_rest(self) -> None:
+        code, snapshot, _ = self.run_collector("--graphql-batch", "--batch-size", "2")
+
+        self.assertEqual(code, 2)
+        self.assertEqual([item["issue"]["number"] for item in snapshot["issues"]], [10, 11, 12])
+        self.assertEqual([item["pull_request"]["number"] for item in snapshot["pull_requests"]], [1, 2, 3, 4, 5])
+        batch = snapshot["graphql_batch"]
+        self.assertEqual((batch["queries"], batch["cost"]), (5, 5))
+        self.assertEqual(batch["rest_refetched"], ["pr#3", "pr#4"])
+        self.assertEqual([error["scope"] for error in snapshot["errors"]], ["pr#3"])
+        self.assertEqual(snapshot["pull_requests"][3]["detail"]["updated_at"], "2026-01-01T00:00:00Z")
+        self.assertEqual(snapshot["pull_requests"][0]["issue_comments"][0]["user"], {"login": "a"})
+        markdown = (self.root / "state0" / "out" / "open-work-state.md").read_text()
+        self.assertIn("- GraphQL batch: 5 queries, cost 5, 4990 points remaining, 2 items refetched via REST", markdown)
+
+    def test_repeat_snapshot_replays_not_modified_rest_responses(self) -> None:
+        _, first, _ = self.run_collector()
+        _, second, _ = self.run_collector()
+
+        self.assertEqual(first["http_cache"]["not_modified"], 0)
+        self.assertEqual(second["http_cache"]["miss"], 0)
+        self.assertEqual(second["http_cache"]["not_modified"], first["http_cache"]["miss"])
+        not_modified = (self.root / "state1" / "not_modified").read_text().split()
+        self.assertIn("/repos/acme/widgets/pulls", not_modified)
+        for key in ("issues", "pull_requests", "errors", "repo_info"):
+            self.assertEqual(second[key], first[key])
+
+    def test_since_snapshot_recollects_only_changed_items(self) -> None:
+        self.run_collector()
+        previous = self.root / "state0" / "out" / "open-work-state.json"
+        code, snapshot, _ = self.run_collector(
+            "--since-snapshot", str(previous), FAKE_GH_UPDATED="11,2,13", FAKE_GH_CLOSED="12,5"
+        )
+
+        self.assertEqual(code, 2)
+        self.assertEqual([item["issue"]["number"] for item in snapshot["issues"]], [13, 11, 10])
+        self.assertEqual([item["pull_request"]["number"] for item in snapshot["pull_requests"]], [1, 2, 3, 4])
+        incremental = snapshot["incremental"]
+        self.assertEqual(incremental["new"], ["issue#13"])
+        self.assertEqual(incremental["updated"], ["issue#11", "pr#2", "pr#3"])
+        self.assertEqual(incremental["closed"], ["issue#12", "pr#5"])
+        self.assertEqual(incremental["carried_forward"], 3)
+        calls = (self.root / "state1" / "calls").read_text()
+        self.assertIn("/issues/11/comments", calls)
+        self.assertNotIn("/issues/10/comments", calls)
+        self.assertNotIn("/pulls/4", calls)
+        markdown = (self.root / "state1" / "out" / "open-work-state.md").read_text()
+        self.assertIn("- Closed or merged: issue#12, pr#5", markdown)
+
+    def test_since_snapshot_with_wrong_shape_falls_back_to_full_collection(self) -> None:
+        full_code, full, _ = self.run_collector()
+        for bogus in ('{"repo": "acme/widgets"}', '{"repo": "acme/widgets", "captured_at": "soon"}', "[]"):
+            previous = self.root / "bogus.json"
+            previous.write_text(bogus)
+            code, snapshot, _ = self.run_collector("--since-snapshot", str(previous))
+
+            self.assertEqual(code, full_code)
+            self.assertNotIn("incremental", snapshot)
+            self.assertEqual(snapshot["issues"], full["issues"])
+            self.assertEqual(snapshot["pull_requests"], full["pull_requests"])
+
+
+if __name__ == "__main__":
+    unittest.main()
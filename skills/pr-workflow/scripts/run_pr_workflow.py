@@ -9,13 +9,18 @@ import subprocess
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 COMMON_DIR = Path(__file__).resolve().parents[2] / "_common"
 if str(COMMON_DIR) not in sys.path:
     sys.path.insert(0, str(COMMON_DIR))
 
-from progress_runtime import StatusTracker, default_status_path, run_command_capture
+from progress_runtime import GraphStep, StatusTracker, default_status_path, run_command_capture, run_step_graph
+from worktree_state import is_fresh, worktree_fingerprint
+
+
+# Lint/format/full-dataset output is only excerpted, so keep head/tail bytes only.
+_CAPTURE_LIMIT_BYTES = 1024 * 1024
 
 
 @dataclass(frozen=True)
@@ -49,6 +54,7 @@ def run_command(
     cwd: Path,
     tracker: StatusTracker | None = None,
     relay_stdout_to_stderr: bool = False,
+    capture_limit_bytes: int | None = None,
 ) -> CommandResult:
     process = run_command_capture(
         command=command,
@@ -57,6 +63,7 @@ def run_command(
         tracker=tracker,
         relay_stdout_to_stderr=relay_stdout_to_stderr,
         relay_stderr=True,
+        capture_limit_bytes=capture_limit_bytes,
     )
     return CommandResult(
         name=name,
@@ -405,8 +412,18 @@ def run_code_health(
     return result, expected_json, payload
 
 
-def reuse_code_health_json(path: Path) -> tuple[CommandResult, Path, dict[str, Any]]:
-    payload = load_json(path)
+def reuse_code_health_json(
+    path: Path, tree_state: dict[str, str | None], *, expect: dict[str, Any] | None = None
+) -> tuple[CommandResult, Path, dict[str, Any]] | None:
+    """Reuse a report only if it was produced from the current HEAD and working tree (and matches expect)."""
+    try:
+        payload = load_json(path)
+    except ValueError:
+        return None
+    if not is_fresh(payload, tree_state):
+        return None
+    if any(payload.get(key) != value for key, value in (expect or {}).items()):
+        return None
     result = CommandResult(
         name="code_health",
         command=("reuse", str(path)),
@@ -418,6 +435,22 @@ def reuse_code_health_json(path: Path) -> tuple[CommandResult, Path, dict[str, A
     return result, path, payload
 
 
+def tracked_step(tracker: StatusTracker, name: str, action: Callable[[], Any]) -> Callable[[], Any]:
+    """Report an in-process collector as a tracker step so concurrent phases show up side by side."""
+
+    def run() -> Any:
+        tracker.start_step(name, command=("git",), message=f"collecting {name}")
+        try:
+            value = action()
+        except Exception as exc:
+            tracker.finish_step(name, returncode=1, stderr=str(exc))
+            raise
+        tracker.finish_step(name, returncode=0)
+        return value
+
+    return run
+
+
 def run_checklist_evaluator(
     *,
     code_health_json: Path,
@@ -517,13 +550,35 @@ def main() -> None:
         tracker.set_artifact("workflow_output_json", str(args.output_json.resolve()))
     if args.pr_brief_output is not None:
         tracker.set_artifact("pr_brief_markdown", str(args.pr_brief_output.resolve()))
-    tracker.set_phase("branch-context", message=f"collecting PR workflow context for {branch_name} since fork point")
-    branch_context = collect_branch_context(repo_root, base)
     out_dir = args.code_health_out_dir if args.code_health_out_dir is not None else default_code_health_out_dir()
-
-    if args.code_health_json is None:
-        tracker.set_phase("code-health", message="running code-health prerequisite")
-        code_health_result, code_health_json_path, code_health_payload = run_code_health(
+    tree_state = worktree_fingerprint(repo_root)
+
+    def code_health_phase() -> tuple[CommandResult, Path, dict[str, Any]]:
+        if args.code_health_json is not None:
+            path = args.code_health_json.resolve()
+            reused = reuse_code_health_json(path, tree_state)
+            if reused is None:
+                tracker.log(f"{path} was not produced from the current HEAD and working tree; re-running code-health")
+        else:
+            path = expected_code_health_json(repo_root, branch_name, out_dir)
+            reused = reuse_code_health_json(
+                path,
+                tree_state,
+                expect={
+                    "mode": args.code_health_mode,
+                    "top": args.code_health_top,
+                    "top_files": args.code_health_top_files,
+                    "coverage_skipped": args.skip_coverage,
+                    "base_ref": base,
+                    "failure": None,
+                },
+            )
+        if reused is not None:
+            tracker.log(f"reusing up-to-date code-health JSON {path}")
+            tracker.set_artifact("code_health_json", str(path))
+            tracker.set_artifact("code_health_status_json", reused[2].get("status_json"))
+            return reused
+        return run_code_health(
             repo_root=repo_root,
             base=base,
             out_dir=out_dir,
@@ -533,42 +588,23 @@ def main() -> None:
             skip_coverage=args.skip_coverage,
             tracker=tracker,
         )
-    else:
-        tracker.set_phase("code-health", message="reusing existing code-health JSON")
-        code_health_result, code_health_json_path, code_health_payload = reuse_code_health_json(
-            args.code_health_json.resolve()
-        )
-        tracker.set_artifact("code_health_json", str(args.code_health_json.resolve()))
-        tracker.set_artifact("code_health_status_json", code_health_payload.get("status_json"))
 
-    tracker.set_phase("lint-format", message="running lint and format checks")
-    lint_result = run_command(
-        name="lint",
-        command=parse_command(args.lint_cmd),
-        cwd=repo_root,
-        tracker=tracker,
-        relay_stdout_to_stderr=True,
-    )
-    format_result = run_command(
-        name="format",
-        command=parse_command(args.format_cmd),
-        cwd=repo_root,
-        tracker=tracker,
-        relay_stdout_to_stderr=True,
-    )
+    def run_check(name: str, command_text: str, phase: str, message: str) -> Callable[[], CommandResult]:
+        def run() -> CommandResult:
+            tracker.set_phase(phase, message=message)
+            return run_command(
+                name=name,
+                command=parse_command(command_text),
+                cwd=repo_root,
+                tracker=tracker,
+                relay_stdout_to_stderr=True,
+                capture_limit_bytes=_CAPTURE_LIMIT_BYTES,
+            )
 
-    if args.require_full_dataset:
-        tracker.set_phase("full-dataset", message="running full dataset verification")
-        full_dataset_result = run_command(
-            name="full_dataset",
-            command=parse_command(args.full_dataset_cmd),
-            cwd=repo_root,
-            tracker=tracker,
-            relay_stdout_to_stderr=True,
-        )
-        full_dataset_status = command_status(full_dataset_result)
-    else:
-        full_dataset_result = CommandResult(
+        return run
+
+    def skipped_full_dataset() -> CommandResult:
+        return CommandResult(
             name="full_dataset",
             command=tuple(),
             returncode=0,
@@ -576,20 +612,63 @@ def main() -> None:
             stderr="",
             reused=True,
         )
-        full_dataset_status = "not_run"
-
-    tracker.set_phase("breaking-changes", message="collecting breaking-change hints")
-    breaking_changes = collect_breaking_change_hints(repo_root, base)
-    tracker.set_phase("checklist", message="evaluating checklist from collected results")
-    checklist_payload = run_checklist_evaluator(
-        code_health_json=code_health_json_path,
-        repo_root=repo_root,
-        lint_status=command_status(lint_result),
-        format_status=command_status(format_result),
-        breaking_changes_status="passed",
-        require_full_dataset=args.require_full_dataset,
-        full_dataset_status=full_dataset_status,
+
+    def checklist_phase() -> dict[str, Any]:
+        tracker.set_phase("checklist", message="evaluating checklist from collected results")
+        return run_checklist_evaluator(
+            code_health_json=results["code_health"][1],
+            repo_root=repo_root,
+            lint_status=command_status(results["lint"]),
+            format_status=command_status(results["format"]),
+            breaking_changes_status="passed",
+            require_full_dataset=args.require_full_dataset,
+            full_dataset_status=command_status(results["full_dataset"]) if args.require_full_dataset else "not_run",
+        )
+
+    # The git-only collectors never wait on code-health. Lint/format start after it, since a
+    # formatter may rewrite files the analyzers are reading; the checklist needs every result.
+    tracker.set_phase(
+        "collect",
+        message=f"collecting branch context, breaking-change hints and code-health for {branch_name} since fork point",
+    )
+    results = run_step_graph(
+        [
+            GraphStep(
+                "branch_context",
+                tracked_step(tracker, "branch_context", lambda: collect_branch_context(repo_root, base)),
+            ),
+            GraphStep(
+                "breaking_changes",
+                tracked_step(tracker, "breaking_changes", lambda: collect_breaking_change_hints(repo_root, base)),
+            ),
+            GraphStep("code_health", code_health_phase),
+            GraphStep(
+                "lint",
+                run_check("lint", args.lint_cmd, "lint-format", "running lint and format checks"),
+                depends_on=("code_health",),
+            ),
+            GraphStep(
+                "format",
+                run_check("format", args.format_cmd, "lint-format", "running format check"),
+                depends_on=("lint",),
+            ),
+            GraphStep(
+                "full_dataset",
+                run_check("full_dataset", args.full_dataset_cmd, "full-dataset", "running full dataset verification")
+                if args.require_full_dataset
+                else skipped_full_dataset,
+                depends_on=("format",),
+            ),
+        ],
+        max_workers=3,
     )
+    branch_context = results["branch_context"]
+    breaking_changes = results["breaking_changes"]
+    code_health_result, code_health_json_path, code_health_payload = results["code_health"]
+    lint_result = results["lint"]
+    format_result = results["format"]
+    full_dataset_result = results["full_dataset"]
+    checklist_payload = checklist_phase()
 
     output = {
         "repo_root": str(repo_root),